@@ -0,0 +1,27 @@
+"""add users (created_at, id) index for keyset pagination
+
+Revision ID: 3e7a9b1c4d25
+Revises: 9d4f1a7c2e60
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a9b1c4d25'
+down_revision: Union[str, None] = '9d4f1a7c2e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,128 @@
+"""partition refresh_tokens by expires_at (monthly)
+
+Revision ID: 9d4f1a7c2e60
+Revises: 5b2e8c41d7a3
+Create Date: 2026-10-17 11:03:27.804115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f1a7c2e60'
+down_revision: Union[str, None] = '5b2e8c41d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, created_at, updated_at, user_id, token_hash, expires_at, revoked_at, "
+    "ip_address, user_agent, replaced_by, is_used"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partition key phải nằm trong PK và unique index, nên PK = (id, expires_at)
+    # và unique index token_hash = (token_hash, expires_at).
+    op.execute("""
+        CREATE TABLE refresh_tokens_new (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY (START WITH 10000) NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            user_id UUID NOT NULL,
+            token_hash VARCHAR(64) NOT NULL,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            revoked_at TIMESTAMP WITHOUT TIME ZONE,
+            ip_address INET,
+            user_agent VARCHAR,
+            replaced_by VARCHAR(64),
+            is_used BOOLEAN NOT NULL
+        ) PARTITION BY RANGE (expires_at);
+    """)
+
+    # Partition theo tháng: từ tháng hiện tại tới hết thời hạn refresh token (30 ngày) + 3 tháng dự phòng.
+    # Các tháng sau đó do maintenance task tạo (app/services/maintenance_service.py).
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start DATE;
+        BEGIN
+            FOR month_start IN
+                SELECT generate_series(
+                    date_trunc('month', now()),
+                    date_trunc('month', now() + interval '30 days') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE refresh_tokens_p%s PARTITION OF refresh_tokens_new FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start, 'YYYYMM'), month_start, (month_start + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+    """)
+
+    # Token đã hết hạn không còn giá trị, chỉ chuyển các token còn hiệu lực
+    op.execute(f"""
+        INSERT INTO refresh_tokens_new ({COLUMNS})
+        SELECT {COLUMNS} FROM refresh_tokens WHERE expires_at > now();
+    """)
+    op.drop_table('refresh_tokens')
+    op.execute("ALTER TABLE refresh_tokens_new RENAME TO refresh_tokens;")
+
+    op.create_primary_key('pk_refresh_tokens', 'refresh_tokens', ['id', 'expires_at'])
+    op.create_foreign_key(None, 'refresh_tokens', 'users', ['user_id'], ['id'])
+    op.create_index(op.f('ix_refresh_tokens_id'), 'refresh_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash', 'expires_at'], unique=True)
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('refresh_tokens', 'id'),
+            GREATEST((SELECT MAX(id) FROM refresh_tokens), 10000),
+            true
+        );
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned;")
+    op.execute("ALTER INDEX ix_refresh_tokens_id RENAME TO ix_refresh_tokens_partitioned_id;")
+    op.execute("ALTER INDEX ix_refresh_tokens_token_hash RENAME TO ix_refresh_tokens_partitioned_token_hash;")
+    op.execute("ALTER INDEX ix_refresh_tokens_user_id RENAME TO ix_refresh_tokens_partitioned_user_id;")
+    op.execute("ALTER TABLE refresh_tokens_partitioned RENAME CONSTRAINT pk_refresh_tokens TO pk_refresh_tokens_partitioned;")
+
+    op.create_table('refresh_tokens',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False, start=10000), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.Column('ip_address', postgresql.INET(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('replaced_by', sa.String(length=64), nullable=True),
+    sa.Column('is_used', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id', name='pk_refresh_tokens')
+    )
+    op.execute(f"""
+        INSERT INTO refresh_tokens ({COLUMNS})
+        SELECT {COLUMNS} FROM refresh_tokens_partitioned;
+    """)
+    op.execute("DROP TABLE refresh_tokens_partitioned CASCADE;")
+    op.create_index(op.f('ix_refresh_tokens_id'), 'refresh_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('refresh_tokens', 'id'),
+            GREATEST((SELECT MAX(id) FROM refresh_tokens), 10000),
+            true
+        );
+    """)
@@ -0,0 +1,35 @@
+"""add DEFAULT partition to refresh_tokens
+
+Revision ID: a7c3e5f19b42
+Revises: 3e7a9b1c4d25
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f19b42'
+down_revision: Union[str, None] = '3e7a9b1c4d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Maintenance trễ quá số tháng tạo sẵn thì INSERT vẫn thành công (vào DEFAULT) thay vì
+    # "no partition of relation found"; lần maintenance kế tiếp chuyển các dòng sang partition tháng.
+    op.execute("CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE refresh_tokens DETACH PARTITION refresh_tokens_default;")
+    # Dòng còn hiệu lực được đưa lại qua bảng cha; cần partition tháng tương ứng đã tồn tại
+    op.execute("""
+        INSERT INTO refresh_tokens
+        SELECT * FROM refresh_tokens_default WHERE expires_at > now();
+    """)
+    op.execute("DROP TABLE refresh_tokens_default;")
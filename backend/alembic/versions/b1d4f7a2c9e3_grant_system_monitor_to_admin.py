@@ -0,0 +1,45 @@
+"""grant system:monitor to the admin role
+
+Revision ID: b1d4f7a2c9e3
+Revises: a7c3e5f19b42
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1d4f7a2c9e3'
+down_revision: Union[str, None] = 'a7c3e5f19b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # /utils/pool-stats và /utils/slow-queries cần quyền này; sync catalog lúc khởi động chỉ
+    # tạo quyền chứ không gán cho role nào
+    op.execute("""
+        INSERT INTO permissions (name, module, display_name, created_at, updated_at)
+        VALUES ('system:monitor', 'system', 'System Monitor', now(), now())
+        ON CONFLICT (name) DO NOTHING;
+    """)
+    op.execute("""
+        INSERT INTO role_permission (role_id, permission_id)
+        SELECT roles.id, permissions.id
+        FROM roles, permissions
+        WHERE roles.name = 'admin' AND permissions.name = 'system:monitor'
+        ON CONFLICT DO NOTHING;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        DELETE FROM role_permission
+        USING roles, permissions
+        WHERE role_permission.role_id = roles.id AND roles.name = 'admin'
+          AND role_permission.permission_id = permissions.id AND permissions.name = 'system:monitor';
+    """)
@@ -1,70 +1,132 @@
-from collections.abc import Generator
-from typing import Annotated
+import time
+from collections.abc import AsyncGenerator
+from typing import Annotated, TypeVar
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import security
+from app.core import deadlines, security
 from app.core.config import settings
-from app.core.db import engine, get_session, AsyncSessionLocal
+from app.core.db import AsyncSessionLocal, RequestSession
 from app.core.exceptions import NotFoundError
+from app.core.permission_cache import permission_cache
+from app.core.principal_cache import principal_cache
 from app.db.models import User
-from app.db.repositories.permission_repository import PermissionRepository
 from app.db.repositories.role_repository import RoleRepository
 from app.db.repositories.user_repository import UserRepository
-from app.schemas.token_schema import TokenPayload
+from app.schemas.token_schema import TokenPayload, TokenPrincipal
+from app.schemas.user_schema import UserPrincipal
 from app.services.unit_of_work import UnitOfWork
 from app.utils import messages
+from app.utils.constants import P
+from app.utils.enums import TokenType
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/auth/login/access-token"
 )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        yield session
+async def get_request_session(request: Request) -> AsyncGenerator[RequestSession, None]:
+    request_session = RequestSession(AsyncSessionLocal)
+    request.state.db = request_session
+    try:
+        yield request_session
+    finally:
+        await request_session.close()
+
+
+RequestSessionDep = Annotated[RequestSession, Depends(get_request_session)]
+
+
+async def get_shared_session(request_session: RequestSessionDep) -> AsyncSession:
+    return request_session.session
 
 
-SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(oauth2_scheme)]
-AsyncSessionDep = Annotated[AsyncSession, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_shared_session)]
 
 
-async def get_current_user(session: AsyncSessionDep, token: TokenDep) -> User:
+def _decode_token(token: str, schema: type[ModelT]) -> ModelT:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        # Refresh token ký cùng khóa nhưng không được dùng làm Bearer token
+        if payload.get("typ") != TokenType.ACCESS.value:
+            raise InvalidTokenError("Not an access token")
+        return schema(**payload)
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+
+async def get_current_user(session: AsyncSessionDep, token: TokenDep) -> UserPrincipal:
+    token_data = _decode_token(token, TokenPayload)
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        user_repo = UserRepository(session)
+        principal = await user_repo.get_principal(token_data.sub)
+        if not principal:
+            raise NotFoundError(message=messages.User.USER_NOT_FOUND)
+        principal_cache.set(principal)
+    if token_data.tv is not None and token_data.tv != principal.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    if not principal.verified:
+        raise HTTPException(status_code=400, detail=messages.Auth.ACCOUNT_NOT_YET_ACTIVE)
+    return principal
+
+CurrentUser = Annotated[UserPrincipal, Depends(get_current_user)]
+
+
+async def get_current_user_entity(principal: CurrentUser, session: AsyncSessionDep) -> User:
+    # Chỉ dùng cho handler thực sự cần toàn bộ entity User
     user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(token_data.sub)
+    user = await user_repo.get_by_id(principal.id)
     if not user:
         raise NotFoundError(message=messages.User.USER_NOT_FOUND)
-    if not user.verified:
-        raise HTTPException(status_code=400, detail=messages.Auth.ACCOUNT_NOT_YET_ACTIVE)
     return user
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUserEntity = Annotated[User, Depends(get_current_user_entity)]
+
+
+async def get_token_principal(token: TokenDep) -> TokenPrincipal:
+    principal = _decode_token(token, TokenPrincipal)
+    if not principal.ver:
+        raise HTTPException(status_code=400, detail=messages.Auth.ACCOUNT_NOT_YET_ACTIVE)
+    return principal
+
+CurrentPrincipal = Annotated[TokenPrincipal, Depends(get_token_principal)]
 
 
 def require_permission(perm_name: str):
+    perm = P(perm_name)
+
+    if settings.STATELESS_AUTH:
+        async def claims_wrapper(principal: CurrentPrincipal):
+            if not principal.perm & perm.mask:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=messages.Auth.PERMISSION_DENIED
+                )
+
+        return claims_wrapper
+
     async def wrapper(user: CurrentUser, session: AsyncSessionDep):
-        perm_repo = PermissionRepository(session)
-        existing_perm = await perm_repo.get_perm_by_role(user.role_id, perm_name)
+        allowed = await permission_cache.has_permission(session, user.role_id, perm)
 
-        if not existing_perm:
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=messages.Auth.PERMISSION_DENIED
@@ -73,5 +135,21 @@ def require_permission(perm_name: str):
     return wrapper
 
 
-def get_uow() -> UnitOfWork:
-    return UnitOfWork(session_factory=AsyncSessionLocal)
\ No newline at end of file
+def request_deadline(budget_ms: int | None):
+    """
+    Đặt deadline cho request, dùng ở `dependencies` của router hoặc route.
+
+    Deadline tính từ dependency deadline đầu tiên của request, nên khai báo ở route
+    (vd. bulk) ghi đè mặc định của router mà không cộng dồn thời gian đã trôi qua;
+    `budget_ms=None` ở route bỏ luôn deadline của router.
+    """
+    async def wrapper(request: Request) -> None:
+        if not hasattr(request.state, "deadline_started_at"):
+            request.state.deadline_started_at = time.monotonic()
+        deadlines.set_deadline(request.state.deadline_started_at, budget_ms)
+
+    return wrapper
+
+
+def get_uow(request_session: RequestSessionDep) -> UnitOfWork:
+    return UnitOfWork(session_factory=AsyncSessionLocal, request_session=request_session)
\ No newline at end of file
@@ -9,6 +9,7 @@ api_router.include_router(auth_router.router)
 api_router.include_router(role_router.router)
 api_router.include_router(admin_router.router)
 api_router.include_router(perm_router.router)
+api_router.include_router(utils.router)
 
 # if settings.ENVIRONMENT == "local":
 #     api_router.include_router(private.router)
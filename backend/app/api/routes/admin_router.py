@@ -1,12 +1,16 @@
 from types import NoneType
-from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, Depends
 from starlette import status
 
-from app.api.deps import require_permission, get_uow
-from app.schemas.admin_schema import AdminUserCreate
+from app.api.deps import CurrentUser, get_uow, request_deadline, require_permission
+from app.core.config import settings
+from app.schemas.admin_schema import (
+    AdminBulkDeleteResult,
+    AdminUserCreate,
+    AdminUserRoleUpdate,
+)
 from app.schemas.response_schema import ModelResponse, PaginationParams
 from app.schemas.user_schema import UserResponse
 from app.services.admin_service import get_admin_service
@@ -15,7 +19,8 @@ from app.utils.constants import P
 
 router = APIRouter(
     prefix="/admin",
-    tags=["Admin"]
+    tags=["Admin"],
+    dependencies=[Depends(request_deadline(settings.REQUEST_DEADLINE_ADMIN_MS))]
 )
 
 
@@ -35,7 +40,7 @@ async def get_user(id: UUID, uow=Depends(get_uow), admin_service=Depends(get_adm
 
 @router.get("/users",
             status_code=status.HTTP_200_OK,
-            response_model=ModelResponse[List[UserResponse]],
+            response_model=ModelResponse[list[UserResponse]],
             response_model_exclude_none=True,
             dependencies=[Depends(require_permission(P.USER_READ_LIST))]
             )
@@ -69,11 +74,69 @@ async def create_user(user_in: AdminUserCreate, background_tasks: BackgroundTask
     status_code=status.HTTP_201_CREATED,
     response_model=ModelResponse[NoneType],
     response_model_exclude_none=True,
-    dependencies=[Depends(require_permission(P.USER_CREATE_LIST))]
+    dependencies=[
+        Depends(require_permission(P.USER_CREATE_LIST)),
+        Depends(request_deadline(settings.REQUEST_DEADLINE_BULK_MS)),
+    ]
 )
-async def create_many_users(user_list: List[AdminUserCreate], background_tasks: BackgroundTasks, uow=Depends(get_uow), admin_service=Depends(get_admin_service)):
+async def create_many_users(user_list: list[AdminUserCreate], background_tasks: BackgroundTasks, uow=Depends(get_uow), admin_service=Depends(get_admin_service)):
     await admin_service.create_many_user(uow, user_list, background_tasks)
 
     return ModelResponse(
         message=messages.User.CREATED_MANY_SUCCESS
     )
+
+
+@router.patch(
+    "/users/{id}/role",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[NoneType],
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_permission(P.USER_UPDATE))]
+)
+async def change_user_role(id: UUID, role_in: AdminUserRoleUpdate, current_user: CurrentUser, uow=Depends(get_uow), admin_service=Depends(get_admin_service)):
+    email = await admin_service.change_user_role(uow, id, role_in, current_user.id)
+
+    return ModelResponse(
+        message=messages.Admin.USER_ROLE_UPDATED_SUCCESS.format(username=email)
+    )
+
+
+@router.delete(
+    "/users/{id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[NoneType],
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_permission(P.USER_DELETE))]
+)
+async def delete_user(id: UUID, current_user: CurrentUser, uow=Depends(get_uow), admin_service=Depends(get_admin_service)):
+    await admin_service.delete_user(uow, id, current_user.id)
+
+    return ModelResponse(
+        message=messages.User.DELETED_SUCCESS
+    )
+
+
+@router.post(
+    "/users/bulk-delete",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[AdminBulkDeleteResult],
+    response_model_exclude_none=True,
+    dependencies=[
+        Depends(require_permission(P.USER_DELETE)),
+        Depends(request_deadline(settings.REQUEST_DEADLINE_BULK_MS)),
+    ]
+)
+async def delete_many_users(ids: list[UUID], current_user: CurrentUser, uow=Depends(get_uow), admin_service=Depends(get_admin_service)):
+    result = await admin_service.delete_many_users(uow, ids, current_user.id)
+    if result.not_found:
+        message = messages.Admin.BULK_ACTION_PARTIAL_SUCCESS.format(
+            success_count=result.deleted, fail_count=len(result.not_found)
+        )
+    else:
+        message = messages.Admin.BULK_ACTION_SUCCESS.format(count=result.deleted)
+
+    return ModelResponse(
+        message=message,
+        data=result
+    )
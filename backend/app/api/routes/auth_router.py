@@ -4,10 +4,11 @@ from fastapi import APIRouter, status, Depends, BackgroundTasks, Request, HTTPEx
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import AsyncSessionDep, get_uow
+from app.api.deps import AsyncSessionDep, get_uow, request_deadline
+from app.core.config import settings
 from app.core.db import get_session
 from app.schemas.auth_schema import RegisterRequest, LoginResponse, LoginRequest, VerifyRequest, ResendRequest, \
-    EmailRequest
+    EmailRequest, RefreshRequest, ResetPasswordRequest
 from app.schemas.response_schema import ModelResponse
 from app.schemas.token_schema import VerifyToken
 from app.schemas.user_schema import UserCreate
@@ -16,7 +17,8 @@ from app.utils import messages
 
 router = APIRouter(
     prefix="/auth",
-    tags=["Auth"]
+    tags=["Auth"],
+    dependencies=[Depends(request_deadline(settings.REQUEST_DEADLINE_AUTH_MS))]
 )
 
 
@@ -58,6 +60,20 @@ async def login_access_token(request: Request, form_data: OAuth2PasswordRequestF
     return {"access_token": token, "token_type": "bearer"}
 
 
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[LoginResponse],
+    response_model_exclude_none=True
+)
+async def refresh(request: Request, refresh_in: RefreshRequest, uow=Depends(get_uow), auth_service=Depends(get_auth_service)):
+    response = await auth_service.refresh(uow, refresh_in, request)
+    return ModelResponse(
+        message=messages.Auth.TOKEN_REFRESH_SUCCESS,
+        data=response
+    )
+
+
 @router.post(
     "/email/verify",
     status_code=status.HTTP_200_OK,
@@ -85,4 +101,27 @@ async def resend_verify_email(resend: EmailRequest, background_tasks: Background
     )
 
 
+@router.post(
+    "/password/forgot",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[NoneType],
+    response_model_exclude_none=True
+)
+async def forgot_password(email_request: EmailRequest, background_tasks: BackgroundTasks, uow=Depends(get_uow), auth_service=Depends(get_auth_service)):
+    await auth_service.forgot_password(uow, email_request, background_tasks)
+    return ModelResponse(
+        message=messages.Auth.PASSWORD_RESET_REQUEST_SUCCESS
+    )
+
 
+@router.post(
+    "/password/reset",
+    status_code=status.HTTP_200_OK,
+    response_model=ModelResponse[NoneType],
+    response_model_exclude_none=True
+)
+async def reset_password(reset_in: ResetPasswordRequest, uow=Depends(get_uow), auth_service=Depends(get_auth_service)):
+    await auth_service.reset_password(uow, reset_in)
+    return ModelResponse(
+        message=messages.Auth.PASSWORD_RESET_SUCCESS
+    )
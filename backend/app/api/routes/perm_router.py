@@ -4,7 +4,8 @@ from fastapi import APIRouter, Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
-from app.api.deps import AsyncSessionDep, get_uow, require_permission
+from app.api.deps import AsyncSessionDep, get_uow, require_permission, request_deadline
+from app.core.config import settings
 from app.core.db import get_session
 from app.schemas.perm_schema import PermResponse, PermCreate
 from app.schemas.response_schema import ModelResponse
@@ -14,7 +15,8 @@ from app.utils.constants import P
 
 router = APIRouter(
     prefix="/permission",
-    tags=["Permission"]
+    tags=["Permission"],
+    dependencies=[Depends(request_deadline(settings.REQUEST_DEADLINE_ADMIN_MS))]
 )
 
 
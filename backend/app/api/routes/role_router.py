@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
-from app.api.deps import AsyncSessionDep, get_uow
+from app.api.deps import AsyncSessionDep, get_uow, request_deadline
+from app.core.config import settings
 from app.core.db import get_session
 from app.schemas.response_schema import ModelResponse
 from app.schemas.role_schema import RoleCreate, RoleResponse
@@ -11,7 +12,8 @@ from app.utils import messages
 
 router = APIRouter(
     prefix="/role",
-    tags=["Role"]
+    tags=["Role"],
+    dependencies=[Depends(request_deadline(settings.REQUEST_DEADLINE_ADMIN_MS))]
 )
 
 
@@ -1,3 +1,55 @@
+
+from fastapi import APIRouter, Depends, Query
+from starlette import status
+
+from app.api.deps import require_permission
+from app.core.admission import hash_admission
+from app.core.db import database
+from app.core.password_pool import password_pool
+from app.core.pool_metrics import pool_stats
+from app.core.replicas import replica_router
+from app.core.slow_query_log import slow_query_log
+from app.schemas.response_schema import ModelResponse
+from app.utils import messages
+from app.utils.constants import P
+
+router = APIRouter(
+    prefix="/utils",
+    tags=["Utils"]
+)
+
+
+@router.get("/pool-stats",
+            status_code=status.HTTP_200_OK,
+            response_model=ModelResponse[dict],
+            dependencies=[Depends(require_permission(P.SYSTEM_MONITOR))]
+            )
+async def get_pool_stats():
+    # Số liệu của worker đang xử lý request, không phải tổng của cả deployment
+    return ModelResponse(
+        message=messages.Admin.SYSTEM_STATS_FETCHED,
+        data={
+            "db": pool_stats(database.engine.pool),
+            "replicas": replica_router.stats(),
+            "password_pool": password_pool.stats(),
+            "hash_admission": hash_admission.stats(),
+        }
+    )
+
+
+@router.get("/slow-queries",
+            status_code=status.HTTP_200_OK,
+            response_model=ModelResponse[list[dict]],
+            dependencies=[Depends(require_permission(P.SYSTEM_MONITOR))]
+            )
+async def get_slow_queries(limit: int | None = Query(default=None, ge=1)):
+    # Ring buffer của worker đang xử lý request, mới nhất trước
+    return ModelResponse(
+        message=messages.Admin.SLOW_QUERIES_FETCHED,
+        data=slow_query_log.recent(limit)
+    )
+
+
 # from fastapi import APIRouter, Depends
 # from pydantic.networks import EmailStr
 #
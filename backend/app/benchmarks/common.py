@@ -0,0 +1,51 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCounter:
+    """Đếm số câu SQL, tổng thời gian và thời gian chờ DB của một khối `measure()`."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements: list[str] = []
+        self._db_seconds = 0.0
+        self._started_at = 0.0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+        self._started_at = time.perf_counter()
+
+    def _on_executed(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self._db_seconds += time.perf_counter() - self._started_at
+
+    @contextmanager
+    def measure(self) -> Iterator[dict]:
+        result = {"statements": 0, "ms": 0.0, "db_ms": 0.0}
+        self.statements = []
+        self._db_seconds = 0.0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(self.engine.sync_engine, "after_cursor_execute", self._on_executed)
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            result["ms"] = (time.perf_counter() - start) * 1000
+            event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+            event.remove(self.engine.sync_engine, "after_cursor_execute", self._on_executed)
+            result["statements"] = len(self.statements)
+            result["db_ms"] = self._db_seconds * 1000
+
+
+def print_report(title: str, rows: dict[str, list[dict]]) -> None:
+    print(title)
+    print(f"{'operation':<16}{'runs':>6}{'stmts/op':>10}{'avg ms':>10}{'db ms':>10}")
+    for name, samples in rows.items():
+        runs = len(samples)
+        statements = sum(sample["statements"] for sample in samples) / runs
+        ms = sum(sample["ms"] for sample in samples) / runs
+        db_ms = sum(sample["db_ms"] for sample in samples) / runs
+        print(f"{name:<16}{runs:>6}{statements:>10.1f}{ms:>10.2f}{db_ms:>10.2f}")
@@ -0,0 +1,147 @@
+"""
+So sánh chi phí mỗi lần gọi của các truy vấn nóng: dựng select() mỗi lần (cách cũ)
+với câu lệnh dựng sẵn trong repository, khi tắt và bật prepared statement của psycopg.
+
+Chạy với DB đã migrate và có dữ liệu (admin, role, permission):
+    python -m app.benchmarks.hot_queries --calls 2000
+
+"python µs" = tổng thời gian - thời gian chờ DB (dựng câu lệnh, compile, xử lý kết quả).
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, load_only, raiseload
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.benchmarks.common import StatementCounter
+from app.core.config import settings
+from app.db.models import Permission, Role, RolePermission, User
+from app.db.repositories.permission_repository import PermissionRepository
+from app.db.repositories.role_repository import RoleRepository
+from app.db.repositories.user_repository import UserRepository
+from app.schemas.user_schema import UserCredentials, UserPrincipal
+from app.services.admin_service import USER_RESPONSE_COLUMNS
+
+
+def _inline_cases(session: AsyncSession, user: User, perm_name: str) -> dict:
+    # Bản sao các truy vấn trước khi dùng câu lệnh dựng sẵn
+    async def user_by_email():
+        return (await session.execute(select(User).where(User.email == user.email))).scalars().first()
+
+    async def credentials():
+        statement = select(
+            User.id, User.email, User.role_id, User.verified, User.token_version, User.password_hash
+        ).where(User.email == user.email)
+        row = (await session.execute(statement)).first()
+        return UserCredentials.model_validate(row._mapping)
+
+    async def principal():
+        statement = select(
+            User.id, User.email, User.role_id, User.verified, User.token_version
+        ).where(User.id == user.id)
+        row = (await session.execute(statement)).first()
+        return UserPrincipal.model_validate(row._mapping)
+
+    async def role_by_name():
+        return (await session.execute(select(Role).where(Role.name == "admin"))).scalars().first()
+
+    async def perm_by_role():
+        statement = (
+            select(Permission.name, Permission.name.label("name"))
+            .join(RolePermission, Permission.id == RolePermission.permission_id)
+            .join(Role, Role.id == RolePermission.role_id)
+            .filter(Role.id == user.role_id, Permission.name == perm_name)
+        )
+        return (await session.execute(statement)).first()
+
+    async def by_id():
+        options = [
+            joinedload(User.role),
+            load_only(*(getattr(User, name) for name in USER_RESPONSE_COLUMNS), raiseload=True),
+            raiseload("*"),
+        ]
+        return await session.get(User, user.id, options=options)
+
+    return {
+        "get_user_by_email": user_by_email,
+        "get_credentials": credentials,
+        "get_principal": principal,
+        "get_role_by_name": role_by_name,
+        "get_perm_by_role": perm_by_role,
+        "get_by_id": by_id,
+    }
+
+
+def _cached_cases(session: AsyncSession, user: User, perm_name: str) -> dict:
+    users, roles, perms = UserRepository(session), RoleRepository(session), PermissionRepository(session)
+    return {
+        "get_user_by_email": lambda: users.get_user_by_email(user.email),
+        "get_credentials": lambda: users.get_credentials_by_email(user.email),
+        "get_principal": lambda: users.get_principal(user.id),
+        "get_role_by_name": lambda: roles.get_role_by_name("admin"),
+        "get_perm_by_role": lambda: perms.get_perm_by_role(user.role_id, perm_name),
+        "get_by_id": lambda: users.get_by_id(
+            user.id, load={"role": "joined"}, columns=USER_RESPONSE_COLUMNS, raise_on_lazy=True
+        ),
+    }
+
+
+async def _run_mode(prepare_threshold, calls: int, warmup: int) -> dict:
+    engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        pool_size=1,
+        connect_args={"prepare_threshold": prepare_threshold},
+    )
+    counter = StatementCounter(engine)
+    results = {}
+    try:
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            user = (await session.execute(select(User).order_by(User.created_at).limit(1))).scalars().one()
+            perm_name = (await session.execute(select(Permission.name).limit(1))).scalar_one()
+            session.expunge_all()
+            for style, build in (("inline", _inline_cases), ("cached", _cached_cases)):
+                for name, call in build(session, user, perm_name).items():
+                    for _ in range(warmup):
+                        await call()
+                        session.expunge_all()
+                    samples = []
+                    for _ in range(calls):
+                        with counter.measure() as sample:
+                            await call()
+                        # Bỏ identity map để get_by_id luôn đi xuống DB
+                        session.expunge_all()
+                        samples.append(sample)
+                    results[(name, style)] = samples
+    finally:
+        await engine.dispose()
+    return results
+
+
+def _report(prepare_threshold, results: dict) -> None:
+    print(f"prepare_threshold={prepare_threshold}")
+    print(f"{'query':<20}{'style':>8}{'total µs':>10}{'db µs':>10}{'python µs':>11}")
+    for (name, style), samples in results.items():
+        total = sum(sample["ms"] for sample in samples) * 1000 / len(samples)
+        db = sum(sample["db_ms"] for sample in samples) * 1000 / len(samples)
+        print(f"{name:<20}{style:>8}{total:>10.1f}{db:>10.1f}{total - db:>11.1f}")
+    print()
+
+
+async def run(calls: int, warmup: int) -> None:
+    for prepare_threshold in (None, settings.DB_PREPARE_THRESHOLD or 5):
+        _report(prepare_threshold, await _run_mode(prepare_threshold, calls, warmup))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Đếm số câu SQL mỗi thao tác ghi: register, verify, admin create.
+
+Chạy với DB đã migrate (dùng cấu hình trong .env):
+    python -m app.benchmarks.write_statements --runs 20
+
+User tạo ra có email `bench-*@example.com` và được xóa khi kết thúc.
+"""
+import argparse
+import asyncio
+import uuid
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, select
+
+from app.benchmarks.common import StatementCounter, print_report
+from app.core import security
+from app.core.db import AsyncSessionLocal, database
+from app.core.default_role import default_role
+from app.db.models import User
+from app.schemas.admin_schema import AdminUserCreate
+from app.schemas.auth_schema import RegisterRequest
+from app.schemas.token_schema import VerifyToken
+from app.services.admin_service import AdminService
+from app.services.auth_service import AuthService
+from app.services.unit_of_work import UnitOfWork
+from app.utils.enums import EmailType
+
+EMAIL_PREFIX = "bench-"
+PASSWORD = "Bench@123"
+
+
+def _user_fields(email: str) -> dict:
+    return {"email": email, "password": PASSWORD, "fullname": "Bench User", "dob": "1990-01-01", "gender": "male"}
+
+
+async def _verify_token(email: str) -> VerifyToken:
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(select(User.id, User.verify_token).where(User.email == email))).one()
+    return VerifyToken(token=security.create_link_token(EmailType.VERIFY_ACCOUNT.value, row.id, row.verify_token, 600))
+
+
+async def run(runs: int) -> None:
+    auth_service, admin_service = AuthService(), AdminService()
+    counter = StatementCounter(database.engine)
+    samples: dict[str, list[dict]] = {"register": [], "verify": [], "admin create": []}
+
+    async with AsyncSessionLocal() as session:
+        await default_role.load(session)
+
+    try:
+        for _ in range(runs):
+            email = f"{EMAIL_PREFIX}{uuid.uuid4().hex[:12]}@example.com"
+            uow = UnitOfWork(session_factory=AsyncSessionLocal)
+            with counter.measure() as sample:
+                await auth_service.register(uow, RegisterRequest(**_user_fields(email)), BackgroundTasks())
+            samples["register"].append(sample)
+
+            token = await _verify_token(email)
+            with counter.measure() as sample:
+                await auth_service.verify_account(uow, token)
+            samples["verify"].append(sample)
+
+            admin_email = f"{EMAIL_PREFIX}{uuid.uuid4().hex[:12]}@example.com"
+            with counter.measure() as sample:
+                await admin_service.create_user(uow, AdminUserCreate(**_user_fields(admin_email)), BackgroundTasks())
+            samples["admin create"].append(sample)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(User).where(User.email.startswith(EMAIL_PREFIX)))
+            await session.commit()
+        await database.dispose()
+
+    print_report("SQL statements per write (BEGIN/COMMIT not counted)", samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.utils import messages
+
+
+class AdmissionController:
+    """
+    Giới hạn số tác vụ chạy đồng thời trong một worker, kèm hàng đợi có giới hạn và deadline.
+
+    Khi hàng đợi đầy hoặc chờ quá `queue_timeout` giây thì từ chối ngay bằng
+    `ServiceOverloadedError` (503 + Retry-After) thay vì để request xếp hàng vô hạn.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    def _reject(self) -> ServiceOverloadedError:
+        self.shed += 1
+        return ServiceOverloadedError(messages.SERVICE_UNAVAILABLE, retry_after=self.retry_after)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject()
+            self.queued += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+        }
+
+
+hash_admission = AdmissionController(
+    max_in_flight=settings.HASH_ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.HASH_ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.HASH_ADMISSION_QUEUE_TIMEOUT,
+    retry_after=settings.HASH_ADMISSION_RETRY_AFTER,
+)
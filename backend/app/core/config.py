@@ -29,6 +29,8 @@ class Settings(BaseSettings):
         # Use top level .env file (one level above ./backend/)
         env_file=".env",
         env_ignore_empty=True,
+        # Giá trị rỗng bị bỏ qua (env_ignore_empty), nên các setting `int | None` tắt bằng "None"
+        env_parse_none_str="None",
         extra="ignore",
     )
     API_V1_STR: str = "/api"
@@ -41,10 +43,64 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_SECRET: str
     REFRESH_TOKEN_EXPIRES: int = 2592000
     REFRESH_TOKEN_SECRET: str
+    # refresh_tokens partition maintenance
+    REFRESH_TOKEN_PARTITIONS_AHEAD: int = 2
+    REFRESH_TOKEN_PARTITION_DETACH_ONLY: bool = False
+    MAINTENANCE_INTERVAL: int = 6 * 60 * 60
+    # Nhúng role/quyền vào access token để xác thực request mà không cần truy vấn DB
+    STATELESS_AUTH: bool = False
 
     VERIFY_TOKEN_EXPIRES: int = 600
     PASSWORD_RESET_TOKEN_EXPIRES: int = 600
 
+    # Async engine pool (per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    # psycopg prepare câu lệnh phía server sau N lần chạy trên cùng connection;
+    # DB_PREPARE_THRESHOLD=None để tắt (bắt buộc khi đi qua pgbouncer ở transaction mode)
+    DB_PREPARE_THRESHOLD: int | None = 5
+    # Thống kê SQL theo request: header Server-Timing và cảnh báo N+1 khi một câu lệnh
+    # (cùng shape) chạy quá N lần trong một request
+    SERVER_TIMING: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    # Deadline theo request (ms), mặc định theo router; phần còn lại được đặt làm
+    # statement_timeout (set_config local) mỗi khi transaction bắt đầu. "None" để tắt
+    REQUEST_DEADLINE_AUTH_MS: int | None = 5000
+    REQUEST_DEADLINE_ADMIN_MS: int | None = 10000
+    REQUEST_DEADLINE_BULK_MS: int | None = 60000
+    # Slow query log (per worker): ring buffer xem qua /utils/slow-queries;
+    # EXPLAIN (FORMAT JSON) tự động chỉ chạy ngoài production
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_BUFFER_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    # Bulk insert: số dòng mỗi câu COPY / mỗi câu INSERT nhiều dòng
+    BULK_COPY_CHUNK_SIZE: int = 5000
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    # Số dòng mỗi câu archive (DELETE ... RETURNING -> INSERT INTO deleted_x)
+    ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Đồng bộ enum P vào bảng permissions lúc khởi động
+    PERMISSION_CATALOG_SYNC: bool = True
+    # Permission cache (per worker)
+    PERMISSION_CACHE_TTL: int = 300
+    # Cached total counts for pagination (per worker)
+    COUNT_CACHE_TTL: int = 30
+    # Principal cache for get_current_user (per worker)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # bcrypt process pool (per worker)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Admission control for password hashing (per worker)
+    HASH_ADMISSION_MAX_IN_FLIGHT: int = 4
+    HASH_ADMISSION_MAX_QUEUE: int = 32
+    HASH_ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    HASH_ADMISSION_RETRY_AFTER: int = 1
+
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -80,6 +136,28 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Read replicas "host[:port]", cùng user/password/db với primary
+    POSTGRES_REPLICAS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+    REPLICA_SELECTION: Literal["round_robin", "least_conn"] = "round_robin"
+    REPLICA_HEALTH_CHECK_INTERVAL: int = 10
+    REPLICA_HEALTH_CHECK_TIMEOUT: float = 2.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def replica_database_uris(self) -> list[str]:
+        uris = []
+        for replica in self.POSTGRES_REPLICAS:
+            host, _, port = replica.partition(":")
+            uris.append(str(MultiHostUrl.build(
+                scheme="postgresql+psycopg",
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=host,
+                port=int(port) if port else self.POSTGRES_PORT,
+                path=self.POSTGRES_DB,
+            )))
+        return uris
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -0,0 +1,53 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+class CountCache:
+    """
+    Cache count(*) theo tên bảng trong từng worker.
+
+    Repository ghi vào bảng gọi `invalidate_after_commit(session, table)`: xóa ngay lúc
+    flush thì `count()` của request khác có thể cache lại tổng cũ trước khi transaction
+    commit. Thay đổi từ worker khác chỉ được thấy sau tối đa một TTL.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._items: dict[str, tuple[float, int]] = {}
+
+    def get(self, table: str) -> int | None:
+        item = self._items.get(table)
+        if item is None or item[0] < time.monotonic():
+            return None
+        return item[1]
+
+    def set(self, table: str, count: int) -> None:
+        self._items[table] = (time.monotonic() + self.ttl, count)
+
+    def invalidate(self, table: str) -> None:
+        self._items.pop(table, None)
+
+    def invalidate_after_commit(self, session, table: str) -> None:
+        session.info.setdefault(_PENDING_KEY, set()).add(table)
+
+
+_PENDING_KEY = "count_invalidations"
+
+
+# Nghe ở lớp Session để áp dụng cho mọi session (cả sync_session của AsyncSession)
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    for table in session.info.pop(_PENDING_KEY, ()):
+        count_cache.invalidate(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+count_cache = CountCache(ttl=settings.COUNT_CACHE_TTL)
@@ -1,16 +1,63 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlmodel import Session, create_engine, select
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app import crud
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool
 # from app.db.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
-async_engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), echo=True)
-AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False, autocommit=False)
+
+class Database:
+    """
+    Async engine và session factory của primary.
+
+    Engine được dựng ở lần đầu cần tới (thường là trong lifespan), không phải lúc import:
+    import app (test, CLI, alembic) không tạo pool, và lifespan gọi `dispose()` khi tắt.
+    """
+
+    def __init__(self):
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = create_async_engine(
+                str(settings.SQLALCHEMY_DATABASE_URI),
+                echo=settings.DB_ECHO,
+                poolclass=InstrumentedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+                connect_args={"prepare_threshold": settings.DB_PREPARE_THRESHOLD},
+            )
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(
+                self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False, autocommit=False
+            )
+        return self._session_factory
+
+    def session(self) -> AsyncSession:
+        return self.session_factory()
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+        self._engine = None
+        self._session_factory = None
+
+
+database = Database()
+# Dùng như một session factory: AsyncSessionLocal() trả về AsyncSession mới
+AsyncSessionLocal = database.session
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -18,6 +65,56 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+class RequestSession:
+    """
+    Một AsyncSession dùng chung cho mọi dependency và UnitOfWork trong cùng request.
+
+    Session chỉ được tạo khi có người dùng tới, connection được lấy từ pool ở câu lệnh
+    đầu tiên và trả lại khi UnitOfWork cuối cùng kết thúc (hoặc khi request kết thúc).
+    `checkouts` đếm số lần session phải lấy connection từ pool. `wrote` bật khi request
+    đã ghi vào primary, để các UnitOfWork chỉ đọc sau đó đọc lại từ primary (read-your-writes).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.checkouts = 0
+        self.wrote = False
+        self._session: AsyncSession | None = None
+        self._users = 0
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.session_factory()
+            event.listen(self._session.sync_session, "after_begin", self._on_begin)
+            event.listen(self._session.sync_session, "after_flush", self._on_flush)
+            event.listen(self._session.sync_session, "do_orm_execute", self._on_execute)
+        return self._session
+
+    def _on_begin(self, session, transaction, connection) -> None:
+        self.checkouts += 1
+
+    def _on_flush(self, session, flush_context) -> None:
+        self.wrote = True
+
+    def _on_execute(self, orm_execute_state) -> None:
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            self.wrote = True
+
+    def acquire(self) -> AsyncSession:
+        self._users += 1
+        return self.session
+
+    async def release(self) -> None:
+        self._users -= 1
+        if self._users == 0:
+            await self._session.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
 # otherwise, SQLModel might fail to initialize relationships properly
@@ -0,0 +1,47 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import DeadlineExceededError
+from app.utils import messages
+
+# SQLSTATE query_canceled: Postgres hủy câu lệnh do statement_timeout (hoặc pg_cancel_backend)
+_QUERY_CANCELED = "57014"
+
+# SET LOCAL không nhận bind param; set_config(..., true) tương đương và chỉ sống trong transaction hiện tại
+_SET_STATEMENT_TIMEOUT = "SELECT set_config('statement_timeout', %s, true)"
+
+# Thời điểm hết hạn (time.monotonic) của request hiện tại; None = không giới hạn
+_expires_at: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(started_at: float, budget_ms: int | None) -> None:
+    _expires_at.set(None if budget_ms is None else started_at + budget_ms / 1000)
+
+
+def remaining_ms() -> int | None:
+    """Phần ngân sách còn lại của request (ms), None nếu request không có deadline."""
+    expires_at = _expires_at.get()
+    if expires_at is None:
+        return None
+    return int((expires_at - time.monotonic()) * 1000)
+
+
+def is_statement_timeout(exc: BaseException | None) -> bool:
+    return getattr(getattr(exc, "orig", None), "sqlstate", None) == _QUERY_CANCELED
+
+
+# Nghe ở lớp Session để áp dụng cho mọi session (cả sync_session của AsyncSession). Chỉ chạy khi
+# transaction thật sự bắt đầu (câu SQL đầu tiên), nên block không chạm DB không tốn round-trip nào.
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(_session, _transaction, connection) -> None:
+    timeout_ms = remaining_ms()
+    if timeout_ms is None:
+        return
+    if timeout_ms <= 0:
+        # statement_timeout = 0 nghĩa là không giới hạn
+        raise DeadlineExceededError(messages.DatabaseError.TIMEOUT_ERROR)
+    # Câu lệnh nào chạy quá phần deadline còn lại bị Postgres hủy, trả connection về pool
+    connection.exec_driver_sql(_SET_STATEMENT_TIMEOUT, (str(timeout_ms),))
@@ -0,0 +1,37 @@
+import asyncio
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.exceptions import SystemConfigError
+from app.db.repositories.role_repository import RoleRepository
+from app.utils.constants import DEFAULT_ROLE
+
+
+class DefaultRole:
+    """
+    Id của role mặc định cho user đăng ký mới.
+
+    Được nạp một lần lúc khởi động (lifespan). Role mặc định không được sửa/xóa
+    nên id không đổi trong suốt vòng đời process. Nếu lúc khởi động DB chưa có
+    role (chưa seed), id sẽ được nạp ở request đầu tiên cần đến.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._id: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def load(self, session: AsyncSession) -> int | None:
+        async with self._lock:
+            if self._id is None:
+                role = await RoleRepository(session).get_role_by_name(self.name)
+                self._id = role.id if role else None
+        return self._id
+
+    async def get_id(self, session: AsyncSession) -> int:
+        if self._id is None and await self.load(session) is None:
+            raise SystemConfigError(f"Default role '{self.name}' does not exist.")
+        return self._id
+
+
+default_role = DefaultRole(DEFAULT_ROLE.value)
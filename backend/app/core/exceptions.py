@@ -34,6 +34,17 @@ class NotFoundError(ApplicationError):
         super().__init__(message)
 
 
+class ServiceOverloadedError(ApplicationError):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message, status_code=503)
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(ApplicationError):
+    def __init__(self, message: str):
+        super().__init__(message, status_code=504)
+
+
 # UserNotFound = partial(NotFoundError, entity_name="user")
 # RoleNotFound = partial(NotFoundError, entity_name="role")
 # PermissionNotFound = partial(NotFoundError, entity_name="permission")
@@ -0,0 +1,81 @@
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from app.core.config import settings
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    # Chạy trong process con: trả về thời điểm bắt đầu để tính thời gian chờ trong hàng đợi
+    started_at = time.time()
+    return started_at, fn(*args)
+
+
+class PasswordHashPool:
+    """
+    ProcessPoolExecutor riêng cho bcrypt, tách khỏi thread pool mặc định của event loop.
+
+    Được khởi tạo và đóng trong lifespan của app. Khi chưa khởi tạo (script, CLI)
+    thì `run` quay về executor mặc định như trước.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # Khởi động sẵn các process con để request đầu tiên không phải chờ spawn
+            for _ in range(self.max_workers):
+                self._executor.submit(int)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            return await loop.run_in_executor(None, fn, *args)
+
+        submitted_at = time.time()
+        self.in_flight += 1
+        try:
+            started_at, result = await loop.run_in_executor(self._executor, _timed_call, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+        wait = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+password_pool = PasswordHashPool(max_workers=settings.PASSWORD_HASH_WORKERS)
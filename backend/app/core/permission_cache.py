@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.repositories.permission_repository import PermissionRepository
+from app.utils.constants import P
+
+
+class PermissionCache:
+    """
+    Cache role -> bitmask quyền (theo enum `P`) trong từng worker.
+
+    Toàn bộ bảng role_permission được nạp một lần, sau đó mỗi lần kiểm tra quyền
+    chỉ là một phép AND. Dữ liệu được nạp lại khi hết TTL hoặc khi `invalidate()`
+    được gọi; các worker khác sẽ nhận thay đổi sau tối đa một TTL.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._masks: dict[int, int] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def load(self, session: AsyncSession) -> None:
+        async with self._lock:
+            if self.is_fresh():
+                return
+            rows = await PermissionRepository(session).get_role_perm_names()
+            masks: dict[int, int] = {}
+            for role_id, perm_name in rows:
+                masks[role_id] = masks.get(role_id, 0) | P.to_mask([perm_name])
+            self._masks = masks
+            self._loaded_at = time.monotonic()
+
+    async def get_mask(self, session: AsyncSession, role_id: int) -> int:
+        if not self.is_fresh():
+            await self.load(session)
+        return self._masks.get(role_id, 0)
+
+    async def has_permission(self, session: AsyncSession, role_id: int, perm: P) -> bool:
+        mask = await self.get_mask(session, role_id)
+        return bool(mask & perm.mask)
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+permission_cache = PermissionCache(ttl=settings.PERMISSION_CACHE_TTL)
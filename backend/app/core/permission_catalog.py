@@ -0,0 +1,43 @@
+from collections import Counter
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.permission_cache import permission_cache
+from app.db.repositories.permission_repository import PermissionRepository
+from app.utils.constants import P
+from app.utils.enums import UpsertOutcome
+from app.utils.logger import Module, get_logger
+
+logger = get_logger(Module.DATABASE)
+
+
+def catalog_rows() -> list[dict]:
+    # display_name chỉ dùng khi tạo mới; admin có thể sửa display_name/desc nên sync không ghi đè
+    return [
+        {
+            "name": perm.value,
+            "module": perm.value.split(":", 1)[0],
+            "display_name": perm.name.replace("_", " ").title(),
+        }
+        for perm in P
+    ]
+
+
+async def sync_permission_catalog(session: AsyncSession) -> Counter:
+    """
+    Đồng bộ enum `P` vào bảng permissions bằng một câu upsert lúc khởi động.
+
+    Chỉ thêm quyền mới và cập nhật `module`; quyền có trong DB nhưng không còn trong
+    enum được giữ nguyên vì có thể vẫn đang gán cho role.
+    """
+    outcomes = await PermissionRepository(session).upsert_many(
+        catalog_rows(), conflict_cols=["name"], update_cols=["module"]
+    )
+    summary = Counter(outcomes)
+    if summary[UpsertOutcome.INSERTED] or summary[UpsertOutcome.UPDATED]:
+        permission_cache.invalidate()
+        logger.info(
+            f"Permission catalog synced: {summary[UpsertOutcome.INSERTED]} inserted, "
+            f"{summary[UpsertOutcome.UPDATED]} updated"
+        )
+    return summary
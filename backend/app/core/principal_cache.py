@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.user_schema import UserPrincipal
+
+
+class PrincipalCache:
+    """
+    LRU có TTL chứa `UserPrincipal` (id, email, role_id, verified, token_version) của từng worker.
+
+    Dùng cho `get_current_user` để không phải đọc cả dòng `users` ở mỗi request.
+    Repository ghi vào bản ghi user gọi `invalidate_after_commit(session, user_id)`:
+    xóa ngay trước commit thì request khác có thể nạp lại dòng cũ trong lúc transaction
+    còn mở và giữ nó tới hết TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: OrderedDict[Any, tuple[float, UserPrincipal]] = OrderedDict()
+
+    def get(self, user_id: Any) -> UserPrincipal | None:
+        item = self._items.get(user_id)
+        if item is None:
+            return None
+        expires_at, principal = item
+        if expires_at < time.monotonic():
+            del self._items[user_id]
+            return None
+        self._items.move_to_end(user_id)
+        return principal
+
+    def set(self, principal: UserPrincipal) -> None:
+        self._items[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._items.move_to_end(principal.id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        self._items.pop(user_id, None)
+
+    def invalidate_after_commit(self, session, user_id: Any) -> None:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+_PENDING_KEY = "principal_invalidations"
+
+
+# Nghe ở lớp Session để áp dụng cho mọi session (cả sync_session của AsyncSession)
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+principal_cache = PrincipalCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
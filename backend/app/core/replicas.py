@@ -0,0 +1,102 @@
+import asyncio
+import functools
+import itertools
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.utils.logger import Module, get_logger
+
+logger = get_logger(Module.DATABASE)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine: AsyncEngine = create_async_engine(
+            url,
+            echo=settings.DB_ECHO,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args={"prepare_threshold": settings.DB_PREPARE_THRESHOLD},
+        )
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+        )
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.healthy = True
+
+    def checked_out(self) -> int:
+        return self.engine.pool.checkedout()
+
+
+class ReplicaRouter:
+    """
+    Chọn replica cho các UnitOfWork chỉ đọc.
+
+    Replica được health check định kỳ; replica lỗi bị loại khỏi vòng chọn cho tới
+    lần check kế tiếp thành công. Không còn replica khỏe thì `pick()` trả về None
+    và UnitOfWork dùng primary. Engine của replica được dựng ở lần đầu dùng tới.
+    """
+
+    def __init__(self, urls: list[str], selection: str):
+        self.urls = urls
+        self.selection = selection
+        self._counter = itertools.count()
+
+    @functools.cached_property
+    def replicas(self) -> list[Replica]:
+        return [Replica(url) for url in self.urls]
+
+    def pick(self) -> Replica | None:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.selection == "least_conn":
+            return min(healthy, key=Replica.checked_out)
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_unhealthy(self, replica: Replica, reason: Exception) -> None:
+        if replica.healthy:
+            logger.warning(f"Replica {replica.name} marked unhealthy: {reason}")
+        replica.healthy = False
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), settings.REPLICA_HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            self.mark_unhealthy(replica, e)
+            return
+        if not replica.healthy:
+            logger.info(f"Replica {replica.name} is healthy again")
+        replica.healthy = True
+
+    async def check_health(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def run_health_loop(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL)
+
+    async def dispose(self) -> None:
+        if "replicas" in self.__dict__:
+            await asyncio.gather(*(replica.engine.dispose() for replica in self.replicas))
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "checked_out": replica.checked_out(),
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(settings.replica_database_uris, settings.REPLICA_SELECTION)
@@ -1,16 +1,18 @@
-import asyncio
+import base64
 import hashlib
 import hmac
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
+from uuid import UUID
 
 import jwt
 from passlib.context import CryptContext
 
+from app.core.admission import hash_admission
 from app.core.config import settings
-from app.core.exceptions import InvalidTokenError
-from app.utils.messages import ErrorMessages
+from app.core.password_pool import password_pool
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=11)
 
@@ -48,20 +50,36 @@ def get_token_hash(token: str):
     return hashlib.sha256(token.encode()).hexdigest()
 
 
-def is_valid_token(hash_token, plain_token):
-    new_hash_token = get_token_hash(plain_token)
-    return hmac.compare_digest(hash_token, new_hash_token)
+# Link xác minh email / đặt lại mật khẩu: "<user_id>.<nonce>.<exp>.<chữ ký>".
+# Chữ ký HMAC gắn với mục đích (purpose) nên link xác minh không dùng được để reset.
+# DB chỉ lưu nonce; dùng một lần bằng UPDATE ... WHERE id = :id AND token = :nonce.
+def generate_link_nonce() -> str:
+    return secrets.token_urlsafe(16)
 
 
-def verify_token(hash_token, plain_token, expire_at: datetime):
-    match = is_valid_token(hash_token, plain_token)
-    if not match:
-        raise InvalidTokenError(ErrorMessages.TOKEN_INVALID)
+def _sign_link(purpose: str, payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{purpose}:{payload}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
 
-    if expire_at < datetime.now():
-        raise InvalidTokenError(ErrorMessages.TOKEN_EXPIRED)
 
-    return True
+def create_link_token(purpose: str, user_id: UUID, nonce: str, expires_in: int) -> str:
+    expires = int(time.time()) + expires_in
+    payload = f"{user_id.hex}.{nonce}.{expires}"
+    return f"{payload}.{_sign_link(purpose, payload)}"
+
+
+def parse_link_token(purpose: str, token: str) -> tuple[UUID, str] | None:
+    try:
+        user_hex, nonce, expires, signature = token.split(".")
+        payload = f"{user_hex}.{nonce}.{expires}"
+        # So sánh trên bytes: compare_digest với str chỉ nhận ASCII (TypeError với link bị sửa)
+        if not hmac.compare_digest(signature.encode(), _sign_link(purpose, payload).encode()):
+            return None
+        if int(expires) < time.time():
+            return None
+        return UUID(hex=user_hex), nonce
+    except ValueError:
+        return None
 
 
 # Async version
@@ -73,22 +91,23 @@ def verify_token(hash_token, plain_token, expire_at: datetime):
 
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None,
-        _verify_password_sync,
-        plain_password,
-        hashed_password
-    )
-
-
-async def get_password_hash(password: str) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None,
-        _get_password_hash_sync,
-        password
-    )
+    async with hash_admission.admit():
+        return await password_pool.run(
+            _verify_password_sync,
+            plain_password,
+            hashed_password
+        )
+
+
+async def get_password_hash(password: str, admission: bool = True) -> str:
+    # admission=False cho các tác vụ hàng loạt của admin: xếp hàng thay vì bị từ chối
+    if not admission:
+        return await password_pool.run(_get_password_hash_sync, password)
+    async with hash_admission.admit():
+        return await password_pool.run(
+            _get_password_hash_sync,
+            password
+        )
 
 
 # async def get_token_hash(token: str) -> str:
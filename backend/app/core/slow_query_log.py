@@ -0,0 +1,156 @@
+import asyncio
+import contextvars
+import re
+import sys
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+import greenlet
+
+from app.core.config import settings
+from app.utils.logger import Module, get_logger
+
+logger = get_logger(Module.DATABASE)
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+# Module không tính là "nơi gọi" khi dò stack
+_SKIPPED_MODULES = ("app.core.sql_metrics", "app.core.slow_query_log")
+
+
+def redact_params(parameters) -> dict | list | str | None:
+    """
+    Mô tả tham số câu lệnh theo allowlist: chỉ giữ kiểu và độ dài, không bao giờ giữ giá trị.
+
+    Lọc theo tên tham số không đủ (replaced_by, tham số positional, cột được đặt tên khác),
+    nên không giá trị nào được đưa vào log/buffer.
+    """
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: _describe(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_describe(value) for value in parameters]
+    return _describe(parameters)
+
+
+def _describe(value) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes, bytearray, list, tuple, set, frozenset, dict)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def find_caller() -> str | None:
+    """
+    Method repository (hoặc module app.*) đã phát ra câu lệnh.
+
+    Với AsyncSession, phần sync của SQLAlchemy chạy trong greenlet con; stack của
+    repository/service nằm ở greenlet cha, nơi greenlet_spawn đang chờ.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    if current.parent is not None and current.parent.gr_frame is not None:
+        frame = current.parent.gr_frame
+
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.db.repositories"):
+            owner = frame.f_locals.get("self")
+            owner_name = type(owner).__name__ if owner is not None else module
+            return f"{owner_name}.{frame.f_code.co_name}"
+        if fallback is None and module.startswith("app.") and module not in _SKIPPED_MODULES:
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryLog:
+    """
+    Ghi lại các câu lệnh chạy lâu hơn ngưỡng vào ring buffer (mỗi worker một buffer).
+
+    Ngoài production, câu lệnh còn được EXPLAIN (ANALYZE off, FORMAT JSON) trong một
+    task nền trên connection riêng; plan được gắn vào entry khi có. Plan được cache
+    theo shape câu lệnh để cùng một câu chậm không bị EXPLAIN lặp lại.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool, log: bool):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.log = log
+        self.entries: deque[dict] = deque(maxlen=size)
+        self._plans: OrderedDict[str, object] = OrderedDict()
+        self._plan_cache_size = size
+        self._pending: set[asyncio.Task] = set()
+
+    def observe(self, statement: str, shape: str, parameters, elapsed: float, executemany: bool) -> None:
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "sql": shape,
+            "params": f"<{len(parameters)} rows>" if executemany else redact_params(parameters),
+            "caller": find_caller(),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        if self.log:
+            logger.warning(
+                f"Slow query {entry['duration_ms']}ms from {entry['caller']}: {shape[:300]} params={entry['params']}"
+            )
+
+        if self.explain and not executemany and _EXPLAINABLE.match(statement):
+            self._schedule_explain(entry, statement, parameters)
+
+    def _schedule_explain(self, entry: dict, statement: str, parameters) -> None:
+        if entry["sql"] in self._plans:
+            entry["plan"] = self._plans[entry["sql"]]
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # engine sync (CLI, alembic): không có event loop để chạy nền
+        # Context rỗng: task nền không được kế thừa ContextVar của request (thống kê SQL,
+        # deadline), nếu không câu EXPLAIN sẽ bị tính vào request đã phát ra câu chậm
+        task = loop.create_task(self._explain(entry, statement, parameters), context=contextvars.Context())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _explain(self, entry: dict, statement: str, parameters) -> None:
+        from app.core.db import database
+
+        try:
+            async with database.engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters or None
+                )
+                plan = result.scalar()
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed for slow query from {entry['caller']}: {e}")
+            return
+        entry["plan"] = plan
+        self._plans[entry["sql"]] = plan
+        if len(self._plans) > self._plan_cache_size:
+            self._plans.popitem(last=False)
+
+    def recent(self, limit: int | None = None) -> list[dict]:
+        # Mới nhất trước
+        entries = list(reversed(self.entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self._plans.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_BUFFER_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN and settings.ENVIRONMENT != "production",
+    # Production chỉ giữ ring buffer (xem qua /utils/slow-queries), không ghi WARNING cho từng câu
+    log=settings.ENVIRONMENT != "production",
+)
@@ -0,0 +1,89 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.slow_query_log import slow_query_log
+from app.utils.logger import Module, get_logger
+
+logger = get_logger(Module.DATABASE)
+
+# Danh sách placeholder của IN (...) mở rộng, có thể kèm cast: "(%(id_1_1)s::UUID, %(id_1_2)s::UUID)" -> "(...)"
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%\([^)]+\)s(?:::\w+(?:\[\])?)?\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Dạng (shape) của câu lệnh: gom khoảng trắng và danh sách placeholder của IN."""
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement)).strip()
+
+
+class RequestSQLStats:
+    """Số câu SQL, tổng thời gian DB và số lần chạy của từng shape trong một request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.shapes[normalize_sql(statement)] += 1
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, times) for shape, times in self.shapes.most_common() if times > threshold]
+
+
+_current: ContextVar[RequestSQLStats | None] = ContextVar("request_sql_stats", default=None)
+
+
+def start_request() -> tuple[RequestSQLStats, Token]:
+    stats = RequestSQLStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def report(stats: RequestSQLStats, method: str, path: str) -> None:
+    # Cùng một shape chạy quá N lần trong một request thường là N+1 (lazy load / query trong vòng lặp)
+    for shape, times in stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        logger.warning(f"Possible N+1 in {method} {path}: statement ran {times} times: {shape[:300]}")
+
+
+# Nghe ở lớp Engine để áp dụng cho mọi engine (primary, replica) kể cả engine dựng lazy.
+# Mọi câu lệnh đều được đo để bắt slow query; thống kê theo request chỉ có trong request.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, _cursor, statement, parameters, _context, executemany) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= slow_query_log.threshold_ms:
+        slow_query_log.observe(statement, normalize_sql(statement), parameters, elapsed, executemany)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    # Câu lệnh lỗi không qua after_cursor_execute; bỏ mốc thời gian để không lệch các câu sau
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
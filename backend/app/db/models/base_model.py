@@ -6,6 +6,10 @@ from sqlmodel import SQLModel, Field
 
 
 class CoreModel(SQLModel):
+    # Giá trị do DB sinh (identity id, onupdate updated_at) lấy ngay bằng INSERT/UPDATE ... RETURNING,
+    # không cần refresh() thêm một câu SELECT sau flush
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Optional[int] = Field(
         default=None,
         sa_type=BigInteger,
@@ -1,6 +1,6 @@
 from typing import Optional, TYPE_CHECKING, Any
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlmodel import Field, Relationship, SQLModel
 from uuid import UUID
 from datetime import datetime
@@ -14,10 +14,18 @@ if TYPE_CHECKING:
 
 class RFToken(CoreModel, table=True):
     __tablename__ = "refresh_tokens"
+    # Partition theo tháng trên expires_at, nên expires_at phải nằm trong PK và unique index.
+    # Vì vậy Postgres chỉ bảo đảm (token_hash, expires_at) unique, không phải token_hash riêng:
+    # token_hash là sha256 của JWT có jti ngẫu nhiên nên trùng nhau trên thực tế là không thể;
+    # nếu có, `rotate` (scalar_one_or_none) báo lỗi thay vì đổi nhầm token.
+    __table_args__ = (
+        Index("ix_refresh_tokens_token_hash", "token_hash", "expires_at", unique=True),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
 
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
-    token_hash: str = Field(nullable=False, unique=True, index=True, max_length=64)
-    expires_at: datetime = Field(nullable=False)
+    token_hash: str = Field(nullable=False, max_length=64)
+    expires_at: datetime = Field(nullable=False, primary_key=True)
     revoked_at: Optional[datetime] = Field(default=None, nullable=True)
     ip_address: Optional[str] = Field(default=None, nullable=True, sa_type=INET)
     user_agent: Optional[str] = Field(default=None, nullable=True)
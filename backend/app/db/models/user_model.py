@@ -2,6 +2,7 @@ from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
 from uuid import UUID, uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship
 from pydantic import EmailStr
 
@@ -21,6 +22,10 @@ if TYPE_CHECKING:
 class User(CoreModel, table=True):
 
     __tablename__ = 'users'
+    # Phân trang keyset theo (created_at, id)
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: UUID = Field(primary_key=True, nullable=False, index=True, default_factory=uuid4)
     email: EmailStr = Field(unique=True, index=True, max_length=255, nullable=False)
@@ -37,6 +42,8 @@ class User(CoreModel, table=True):
     verify_token_expire: Optional[datetime] = Field(default=None)
     pwd_reset_token: Optional[str] = Field(default=None)
     pwd_reset_expire: Optional[datetime] = Field(default=None)
+    # Tăng lên khi đổi role hoặc khóa tài khoản để các token cũ không được cấp lại
+    token_version: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
 
     role_id: int = Field(foreign_key="roles.id", nullable=False)
 
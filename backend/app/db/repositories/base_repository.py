@@ -1,29 +1,158 @@
 # file: app/repositories/base.py
 
-from typing import TypeVar, Generic, Optional, Any, List
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime
+from itertools import islice
+from typing import (
+    Any,
+    Generic,
+    NamedTuple,
+    TypeVar,
+)
 
-from psycopg.errors import UniqueViolation
-from sqlalchemy import select, insert
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    Row,
+    Select,
+    SmallInteger,
+    String,
+    TypeDecorator,
+    Uuid,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.exceptions import DuplicateEntryError, ApplicationError
-from app.utils.logger import get_logger, Module
+from app.core.config import settings
+from app.core.count_cache import count_cache
+from app.core.exceptions import ApplicationError, DuplicateEntryError
+from app.schemas.response_schema import Cursor
+from app.utils.enums import CountStrategy, UpsertOutcome
+from app.utils.logger import Module, get_logger
 
 ModelType = TypeVar("ModelType")
 
+# Tên relationship cần eager load, hoặc {tên: chiến lược}
+LoadSpec = Sequence[str] | Mapping[str, str]
+
+_LOADERS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+# Kiểu Postgres cho COPY ... (FORMAT BINARY); thứ tự quan trọng vì BigInteger/SmallInteger là con của Integer
+_COPY_TYPES = (
+    (BigInteger, "int8"),
+    (SmallInteger, "int2"),
+    (Integer, "int4"),
+    (Float, "float8"),
+    (Boolean, "bool"),
+    (Uuid, "uuid"),
+    (Date, "date"),
+    (Enum, "text"),
+    (String, "text"),
+)
+
+# Loader options dựng sẵn theo (model, spec); option là immutable nên dùng chung được,
+# và SQLAlchemy không phải tính lại cache key cho option mới ở mỗi lần get_by_id
+_OPTIONS_CACHE: dict[tuple, tuple] = {}
+
+# Giới hạn bind parameter của giao thức Postgres cho một câu lệnh
+_MAX_BIND_PARAMS = 65535
+
 logger = get_logger(Module.BASE_REPO)
 
 
+class TotalCount(NamedTuple):
+    """Kết quả `count()`: `strategy` là cách thực sự đã dùng (ESTIMATED/CACHED có thể rơi về EXACT)."""
+    total: int | None
+    strategy: CountStrategy
+
+
+class ArchiveDependent(NamedTuple):
+    """Bảng con trỏ tới bảng được archive; không có `archive_model` thì các dòng con chỉ bị xóa."""
+    model: type
+    foreign_key: str
+    archive_model: type | None = None
+    # {cột archive: tên cột gốc | hàm(cột gốc) -> biểu thức}
+    columns: Mapping[str, Any] = {}
+
+
+def _chunks(items: Iterable, size: int):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _copy_type(column) -> str | None:
+    column_type = column.type
+    # AutoString của SQLModel (và các TypeDecorator khác) bọc một kiểu gốc
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl_instance
+    if isinstance(column_type, DateTime):
+        return "timestamptz" if column_type.timezone else "timestamp"
+    for sa_type, pg_type in _COPY_TYPES:
+        if isinstance(column_type, sa_type):
+            return pg_type
+    return None
+
+
 class BaseRepository(Generic[ModelType]):
+    # Thông báo khi INSERT vi phạm unique; repository con ghi đè để cụ thể hơn
+    duplicate_message: str | None = None
+    # Thông báo khi archive/xóa dòng còn bị bảng khác tham chiếu (vi phạm foreign key)
+    in_use_message: str | None = None
+    # Bảng deleted_x; có thì delete() chuyển dòng sang archive thay vì xóa hẳn
+    archive_model: type | None = None
+    # {cột archive: tên cột gốc | hàm(cột gốc) -> biểu thức}; cột trùng tên được map tự động
+    archive_columns: Mapping[str, Any] = {"original_id": "id"}
+    archive_dependents: Sequence[ArchiveDependent] = ()
+
     def __init__(self, model: type[ModelType], session: AsyncSession):
         self.model = model
         self.session = session
 
+    def _raise_duplicate(self, e: IntegrityError):
+        # psycopg import ở đây (đã nạp sẵn khi có lỗi từ driver) để import app không kéo theo psycopg
+        from psycopg.errors import UniqueViolation
+
+        # EAFP (issue #3): DB là trọng tài cho unique, không SELECT kiểm tra trước
+        if isinstance(e.orig, UniqueViolation):
+            message = self.duplicate_message or f"Entry for {self.model.__name__} already exists."
+            raise DuplicateEntryError(message) from e
+        raise e
+
+    def _raise_in_use(self, e: IntegrityError):
+        from psycopg.errors import ForeignKeyViolation
+
+        if isinstance(e.orig, ForeignKeyViolation):
+            message = self.in_use_message or f"{self.model.__name__} is still referenced by other records."
+            raise ApplicationError(message, status_code=409) from e
+        raise e
+
     async def create(self, instance: ModelType) -> ModelType:
         self.session.add(instance)
-        await self.session.flush()
-        await self.session.refresh(instance)
+        try:
+            await self.session.flush()
+        except IntegrityError as e:
+            self._raise_duplicate(e)
+        count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
         return instance
         # try:
         #     await self.session.commit()
@@ -37,12 +166,33 @@ class BaseRepository(Generic[ModelType]):
         #     else:
         #         raise e
 
-    async def create_many(self, instances: List[dict]) -> List[ModelType]:
+    async def create_many(self, instances: list[dict], returning: bool = True) -> list[ModelType]:
+        """
+        Bulk insert. Không cần RETURNING thì đi đường COPY (`copy_many`); cần RETURNING,
+        hoặc bảng có cột COPY binary không hỗ trợ, thì INSERT nhiều dòng theo từng chunk
+        để không vượt giới hạn bind parameter.
+        """
         if not instances:
             return []
-        stm = insert(self.model).values(instances).returning(self.model)
-        result = await self.session.execute(stm)
-        return result.scalars().all()
+        if not returning and self._copy_columns(instances) is not None:
+            await self.copy_many(instances)
+            return []
+
+        columns = {key for row in instances for key in row}
+        chunk_size = min(settings.BULK_INSERT_CHUNK_SIZE, _MAX_BIND_PARAMS // max(len(columns), 1))
+        created = []
+        for chunk in _chunks(instances, chunk_size):
+            stm = insert(self.model).values(chunk)
+            if returning:
+                stm = stm.returning(self.model)
+            try:
+                result = await self.session.execute(stm)
+            except IntegrityError as e:
+                self._raise_duplicate(e)
+            if returning:
+                created.extend(result.scalars().all())
+        count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
+        return created
         # if not instances:
         #     return []
         #
@@ -61,16 +211,196 @@ class BaseRepository(Generic[ModelType]):
         #     else:
         #         raise e
 
-    async def get_by_id(self, instance_id: Any, load_options: Optional[List] = None) -> Optional[ModelType]:
-        query = select(self.model).where(self.model.id == instance_id)
-        if load_options:
-            query.options(*load_options)
+    async def upsert_many(
+            self,
+            rows: list[dict],
+            conflict_cols: Sequence[str],
+            update_cols: Sequence[str] | None = None,
+            chunk_size: int | None = None,
+    ) -> list[UpsertOutcome]:
+        """
+        INSERT ... ON CONFLICT theo từng chunk, trả về kết quả cho từng dòng theo đúng thứ tự `rows`.
+
+        Có `update_cols` thì DO UPDATE các cột đó, nhưng chỉ khi giá trị thực sự khác
+        (dòng không đổi tính là SKIPPED); không có thì DO NOTHING. Dòng trùng khóa trong
+        cùng một lần gọi: dòng sau thắng, các dòng trước là SKIPPED.
+        """
+        if not rows:
+            return []
+        table = self.model.__table__
+
+        def key_of(row) -> tuple:
+            return tuple(row[col] for col in conflict_cols)
+
+        latest = {key_of(row): index for index, row in enumerate(rows)}
+        outcomes = [UpsertOutcome.SKIPPED] * len(rows)
+        unique_rows = [rows[index] for index in sorted(latest.values())]
+
+        columns = {key for row in unique_rows for key in row}
+        size = chunk_size or min(settings.BULK_INSERT_CHUNK_SIZE, _MAX_BIND_PARAMS // max(len(columns), 1))
+        inserted = False
+        for chunk in _chunks(unique_rows, size):
+            stmt = pg_insert(table).values(chunk)
+            if update_cols:
+                set_ = {col: stmt.excluded[col] for col in update_cols}
+                # ON CONFLICT không tự áp onupdate (vd. updated_at)
+                for column in table.columns:
+                    if column.onupdate is not None and column.onupdate.is_clause_element and column.key not in set_:
+                        set_[column.key] = column.onupdate.arg
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(conflict_cols),
+                    set_=set_,
+                    where=tuple_(*(table.c[col] for col in update_cols)).is_distinct_from(
+                        tuple_(*(stmt.excluded[col] for col in update_cols))
+                    ),
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_cols))
+            # xmax = 0 nghĩa là dòng vừa được INSERT; dòng bị UPDATE có xmax khác 0
+            stmt = stmt.returning(*(table.c[col] for col in conflict_cols), literal_column("xmax = 0").label("inserted"))
+            result = await self.session.execute(stmt)
+            for row in result:
+                outcome = UpsertOutcome.INSERTED if row.inserted else UpsertOutcome.UPDATED
+                outcomes[latest[tuple(row[:len(conflict_cols)])]] = outcome
+                inserted = inserted or row.inserted
+
+        if inserted:
+            count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
+        return outcomes
+
+    def _copy_columns(self, rows: list[dict]) -> list | None:
+        # Cột có trong dữ liệu hoặc có default phía Python; cột chỉ có server_default để DB tự điền
+        keys = {key for row in rows for key in row}
+        columns = [
+            column for column in self.model.__table__.columns
+            if column.key in keys or column.default is not None
+        ]
+        for column in columns:
+            if _copy_type(column) is None:
+                return None
+            if column.default is not None and not (column.default.is_callable or column.default.is_scalar):
+                return None
+        return columns
 
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
-        # return await self.session.get(self.model, instance_id)
+    async def copy_many(self, rows: list[dict], chunk_size: int | None = None) -> int:
+        """
+        Ghi hàng loạt bằng COPY ... FROM STDIN (FORMAT BINARY) của psycopg, mỗi chunk một
+        câu COPY. Không có RETURNING: khóa chính phải được gán sẵn hoặc do DB sinh mà
+        caller không cần đọc lại. Trả về số dòng đã ghi.
+        """
+        if not rows:
+            return 0
+        columns = self._copy_columns(rows)
+        if columns is None:
+            raise ApplicationError(f"{self.model.__name__} has columns that cannot be copied in binary format.")
 
-    async def get_all(self, *, offset: int, size: int, order_by: Optional[Any] = None) -> List[ModelType]:
+        # COPY đi thẳng xuống driver, flush trước để các object đang pending (vd. bảng cha) đã có trong DB
+        await self.session.flush()
+        connection = await self.session.connection()
+        dialect = connection.dialect
+        raw = (await connection.get_raw_connection()).driver_connection
+        processors = [column.type.bind_processor(dialect) for column in columns]
+        defaults = [column.default for column in columns]
+        naive_columns = {
+            index for index, column in enumerate(columns)
+            if isinstance(column.type, DateTime) and not column.type.timezone
+        }
+        column_names = ", ".join(f'"{column.name}"' for column in columns)
+        statement = f'COPY "{self.model.__tablename__}" ({column_names}) FROM STDIN (FORMAT BINARY)'
+        copy_types = [_copy_type(column) for column in columns]
+
+        def to_record(row: dict) -> list:
+            record = []
+            for index, column in enumerate(columns):
+                if column.key in row:
+                    value = row[column.key]
+                elif defaults[index] is None:
+                    value = None
+                elif defaults[index].is_callable:
+                    value = defaults[index].arg(None)
+                else:
+                    value = defaults[index].arg
+                if processors[index] is not None and value is not None:
+                    value = processors[index](value)
+                # Giống INSERT: giá trị có timezone đổi sang timezone của session trước khi bỏ tzinfo
+                if index in naive_columns and isinstance(value, datetime) and value.tzinfo is not None:
+                    value = value.astimezone(raw.info.timezone).replace(tzinfo=None)
+                record.append(value)
+            return record
+
+        from psycopg.errors import UniqueViolation
+
+        written = 0
+        try:
+            async with raw.cursor() as cursor:
+                for chunk in _chunks(rows, chunk_size or settings.BULK_COPY_CHUNK_SIZE):
+                    async with cursor.copy(statement) as copy:
+                        copy.set_types(copy_types)
+                        for row in chunk:
+                            await copy.write_row(to_record(row))
+                    written += len(chunk)
+        except UniqueViolation as e:
+            message = self.duplicate_message or f"Entry for {self.model.__name__} already exists."
+            raise DuplicateEntryError(message) from e
+        count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
+        return written
+
+    def loader_options(
+            self,
+            load: LoadSpec | None = None,
+            columns: Sequence[str] | None = None,
+            raise_on_lazy: bool = False,
+    ) -> tuple:
+        """
+        Dựng loader options từ spec khai báo (cache theo spec).
+
+        `load`: tên relationship (mặc định selectin) hoặc dict {tên: "selectin" | "joined"}.
+        `columns`: chỉ nạp các cột này (load_only), cột còn lại raise khi truy cập.
+        `raise_on_lazy`: (opt-in) relationship không khai báo trong `load` sẽ raise thay vì
+        lazy load, tránh câu SQL ngầm (và MissingGreenlet) dưới asyncio.
+        """
+        specs = load if isinstance(load, Mapping) else dict.fromkeys(load or (), "selectin")
+        key = (self.model, tuple(specs.items()), tuple(columns or ()), raise_on_lazy)
+        cached = _OPTIONS_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        options = []
+        for name, strategy in specs.items():
+            if strategy not in _LOADERS:
+                raise ValueError(f"Unknown load strategy '{strategy}' for {self.model.__name__}.{name}")
+            options.append(_LOADERS[strategy](getattr(self.model, name)))
+        if columns:
+            options.append(load_only(*(getattr(self.model, name) for name in columns), raiseload=True))
+        if raise_on_lazy:
+            options.append(raiseload("*"))
+        _OPTIONS_CACHE[key] = tuple(options)
+        return _OPTIONS_CACHE[key]
+
+    async def get_by_id(
+            self,
+            instance_id: Any,
+            load: LoadSpec | None = None,
+            columns: Sequence[str] | None = None,
+            raise_on_lazy: bool = False,
+    ) -> ModelType | None:
+        # session.get xem identity map trước: cùng một row trong một UnitOfWork chỉ tốn một câu SQL
+        options = self.loader_options(load, columns, raise_on_lazy)
+        instance = await self.session.get(self.model, instance_id, options=options)
+        if instance is None:
+            return instance
+
+        # Object lấy từ identity map không áp dụng `options`: có thể đã được nạp trước đó với
+        # load_only (thiếu cột) hoặc chưa nạp relationship được yêu cầu, chỉ nạp phần còn thiếu
+        state = inspect(instance)
+        wanted = list(columns or state.mapper.column_attrs.keys()) + list(load or ())
+        missing = [name for name in wanted if name in state.unloaded]
+        if missing:
+            await self.session.refresh(instance, attribute_names=missing)
+        return instance
+
+    async def get_all(self, *, offset: int, size: int, order_by: Any | None = None) -> list[ModelType]:
+        # Phân trang OFFSET giữ lại để tương thích, xem get_page
         query = select(self.model)
 
         if order_by is not None:
@@ -80,10 +410,80 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.scalars(query)
         return result.all()
 
+    async def get_page(
+            self, *, size: int, cursor: Cursor | None = None, statement: Select | None = None
+    ) -> tuple[list[Row], str | None, str | None]:
+        """
+        Phân trang keyset theo (created_at DESC, id DESC), không dùng OFFSET.
+
+        `statement` mặc định là select(model); có thể truyền câu select có join/cột phụ,
+        thực thể chính phải là cột đầu tiên của mỗi row. Trả về (rows, next_cursor, prev_cursor).
+        """
+        if statement is None:
+            statement = select(self.model)
+        keys = (self.model.created_at, self.model.id)
+        backward = cursor is not None and cursor.backward
+
+        if cursor is not None:
+            position = tuple_(literal(cursor.created_at, keys[0].type), literal(cursor.id, keys[1].type))
+            statement = statement.where(tuple_(*keys) > position if backward else tuple_(*keys) < position)
+        # Lùi trang: quét ngược chiều rồi đảo lại kết quả
+        order_by = [key.asc() for key in keys] if backward else [key.desc() for key in keys]
+        statement = statement.order_by(*order_by).limit(size + 1)
+
+        result = await self.session.execute(statement)
+        rows = result.all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if backward:
+            rows.reverse()
+
+        has_next = cursor is not None if backward else has_more
+        has_prev = has_more if backward else cursor is not None
+        return rows, *self.boundary_cursors(rows, has_next, has_prev)
+
+    @staticmethod
+    def boundary_cursors(rows: list[Row], has_next: bool, has_prev: bool) -> tuple[str | None, str | None]:
+        """Cursor trước/sau của một trang; dùng cả cho trang OFFSET để client chuyển sang cursor."""
+        if not rows:
+            return None, None
+        first, last = rows[0][0], rows[-1][0]
+        next_cursor = Cursor(created_at=last.created_at, id=str(last.id)).encode() if has_next else None
+        prev_cursor = Cursor(created_at=first.created_at, id=str(first.id), backward=True).encode() if has_prev else None
+        return next_cursor, prev_cursor
+
+    async def count(self, strategy: CountStrategy = CountStrategy.EXACT) -> TotalCount:
+        table = self.model.__tablename__
+        if strategy == CountStrategy.NONE:
+            return TotalCount(None, strategy)
+
+        if strategy == CountStrategy.ESTIMATED:
+            # Ước lượng của planner từ lần ANALYZE gần nhất; -1 nghĩa là bảng chưa từng được analyze
+            result = await self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": table},
+            )
+            estimate = result.scalar_one_or_none()
+            if estimate is not None and estimate >= 0:
+                return TotalCount(estimate, strategy)
+
+        if strategy == CountStrategy.CACHED:
+            cached = count_cache.get(table)
+            if cached is not None:
+                return TotalCount(cached, strategy)
+
+        result = await self.session.execute(select(func.count()).select_from(self.model))
+        total = result.scalar_one()
+        if strategy == CountStrategy.CACHED:
+            count_cache.set(table, total)
+        return TotalCount(total, CountStrategy.EXACT)
+
     async def update(self, instance: ModelType):
         self.session.add(instance)
-        await self.session.flush()
-        await self.session.refresh(instance)
+        try:
+            await self.session.flush()
+        except IntegrityError as e:
+            self._raise_duplicate(e)
         return instance
         # self.session.add(instance)
         # try:
@@ -99,10 +499,14 @@ class BaseRepository(Generic[ModelType]):
         #         raise e
 
     async def delete(self, instance_id):
-        instance = await self.get_by_id(instance_id)
+        if self.archive_model is not None:
+            return bool(await self.archive_many([instance_id]))
+        # Cascade khi xóa cần lazy load các relationship con
+        instance = await self.get_by_id(instance_id, raise_on_lazy=False)
         if instance:
             await self.session.delete(instance)
             await self.session.flush()  # Để đảm bảo thao tác delete được đưa vào session
+            count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
             return True
         return False
         # instance = await self.get_by_id(instance_id)
@@ -110,3 +514,66 @@ class BaseRepository(Generic[ModelType]):
         #     await self.session.delete(instance)
         #     await self.session.commit()
         #     return True
+
+    @staticmethod
+    def _archive_insert(source, archive_model: type, columns: Mapping[str, Any]):
+        # INSERT INTO deleted_x (...) SELECT ... FROM <CTE DELETE ... RETURNING>
+        archive_table = archive_model.__table__
+        names, values = [], []
+        for column in archive_table.columns:
+            mapped = columns.get(column.key)
+            if mapped is None:
+                if column.primary_key or column.key not in source.c:
+                    continue
+                mapped = column.key
+            names.append(column.key)
+            values.append(source.c[mapped] if isinstance(mapped, str) else mapped(source.c))
+        # archived_at để server_default now() điền
+        return insert(archive_table).from_select(names, select(*values), include_defaults=False)
+
+    async def archive_many(self, ids: Sequence[Any], batch_size: int | None = None) -> list[Any]:
+        """
+        Chuyển các dòng sang bảng archive, mỗi batch một câu lệnh:
+        WITH moved AS (DELETE ... RETURNING *) INSERT INTO deleted_x SELECT ... FROM moved.
+        Dòng con trong `archive_dependents` được xóa (hoặc archive) bằng CTE trong cùng câu.
+        Trả về id của các dòng đã archive; id không tồn tại không có trong kết quả.
+        Dòng còn bị bảng khác tham chiếu làm cả câu thất bại với ApplicationError (409).
+        """
+        if self.archive_model is None:
+            raise ApplicationError(f"{self.model.__name__} has no archive table.")
+        if not ids:
+            return []
+        table = self.model.__table__
+        primary_key = inspect(self.model).primary_key[0]
+
+        archived = []
+        for batch in _chunks(ids, batch_size or settings.ARCHIVE_BATCH_SIZE):
+            ctes = []
+            for index, dependent in enumerate(self.archive_dependents):
+                child = dependent.model.__table__
+                removed = delete(child).where(child.c[dependent.foreign_key].in_(batch))
+                if dependent.archive_model is None:
+                    ctes.append(removed.cte(f"removed_{index}"))
+                    continue
+                removed = removed.returning(*child.columns).cte(f"removed_{index}")
+                ctes.append(removed)
+                ctes.append(
+                    self._archive_insert(removed, dependent.archive_model, dependent.columns).cte(f"archived_{index}")
+                )
+            moved = delete(table).where(primary_key.in_(batch)).returning(*table.columns).cte("moved")
+            statement = (
+                self._archive_insert(moved, self.archive_model, self.archive_columns)
+                .add_cte(*ctes, moved)
+                # rowcount của INSERT có CTE DML không đáng tin, đếm qua RETURNING
+                .returning(self.archive_model.__table__.c.original_id)
+            )
+            try:
+                result = await self.session.execute(statement)
+            except IntegrityError as e:
+                self._raise_in_use(e)
+            archived.extend(result.scalars().all())
+
+        count_cache.invalidate_after_commit(self.session, self.model.__tablename__)
+        for dependent in self.archive_dependents:
+            count_cache.invalidate_after_commit(self.session, dependent.model.__tablename__)
+        return archived
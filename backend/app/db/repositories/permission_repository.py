@@ -1,25 +1,44 @@
+from sqlalchemy import bindparam
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models import Permission, Role, RolePermission
-from app.db.repositories.base_repository import BaseRepository
+from app.db.models.permission_model import DeletedPermission, DeletedRolePermission
+from app.db.repositories.base_repository import ArchiveDependent, BaseRepository
+
+_PERM_BY_NAME = select(Permission).where(Permission.name == bindparam("name"))
+_PERM_BY_ROLE = (
+    select(Permission.name, Permission.name.label("name"))
+    .join(RolePermission, Permission.id == RolePermission.permission_id)
+    .join(Role, Role.id == RolePermission.role_id)
+    .filter(Role.id == bindparam("role_id"), Permission.name == bindparam("perm_name"))
+)
 
 
 class PermissionRepository(BaseRepository[Permission]):
+    archive_model = DeletedPermission
+    archive_dependents = (
+        ArchiveDependent(
+            RolePermission, "permission_id", DeletedRolePermission,
+            {"original_role_id": "role_id", "original_permission_id": "permission_id"},
+        ),
+    )
+
     def __init__(self, session: AsyncSession):
         super().__init__(Permission, session)
 
     async def get_perm_by_name(self, name: str):
-        stmt = select(Permission).where(Permission.name == name)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(_PERM_BY_NAME, {"name": name})
         return result.first()
 
     async def get_perm_by_role(self, role_id: int, perm_name: str):
+        result = await self.session.execute(_PERM_BY_ROLE, {"role_id": role_id, "perm_name": perm_name})
+        return result.first()
+
+    async def get_role_perm_names(self):
         stmt = (
-            select(Permission.name, Permission.name.label("name"))
-            .join(RolePermission, Permission.id == RolePermission.permission_id)
-            .join(Role, Role.id == RolePermission.role_id)
-            .filter(Role.id == role_id, Permission.name == perm_name)
+            select(RolePermission.role_id, Permission.name)
+            .join(Permission, Permission.id == RolePermission.permission_id)
         )
         result = await self.session.execute(stmt)
-        return result.first()
\ No newline at end of file
+        return result.all()
@@ -1,12 +1,158 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, text, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.models import RFToken
 from app.db.repositories.base_repository import BaseRepository
 
+PARTITION_PREFIX = "refresh_tokens_p"
+# Nhận các dòng có expires_at chưa có partition tháng (maintenance bị trễ)
+DEFAULT_PARTITION = "refresh_tokens_default"
+MAINTENANCE_LOCK_KEY = 7_310_001
+
+
+def _add_months(month_start: date, months: int) -> date:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _partition_name(month_start: date) -> str:
+    return f"{PARTITION_PREFIX}{month_start:%Y%m}"
+
 
 class RFTokenRepository(BaseRepository[RFToken]):
     def __init__(self, session: AsyncSession):
         super().__init__(RFToken, session)
 
+    async def add(self, token: RFToken) -> int:
+        # INSERT ... RETURNING id: không flush/refresh entity, không SELECT lại
+        statement = insert(RFToken).values(**token.model_dump(exclude={"id"})).returning(RFToken.id)
+        result = await self.session.execute(statement)
+        return result.scalar_one()
+
+    async def rotate(self, token_hash: str, new_token_hash: str) -> UUID | None:
+        # Một câu UPDATE ... RETURNING: chỉ token còn hiệu lực và chưa dùng mới được đổi
+        statement = (
+            update(RFToken)
+            .where(
+                RFToken.token_hash == token_hash,
+                RFToken.is_used.is_(False),
+                RFToken.revoked_at.is_(None),
+                RFToken.expires_at > func.now(),
+            )
+            .values(is_used=True, replaced_by=new_token_hash)
+            .returning(RFToken.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def revoke_family(self, token_hash: str) -> int:
+        # Token đã dùng bị gửi lại: thu hồi token đó và toàn bộ chuỗi replaced_by phía sau
+        family = (
+            select(RFToken.token_hash, RFToken.replaced_by)
+            .where(RFToken.token_hash == token_hash, RFToken.is_used.is_(True))
+            .cte("family", recursive=True)
+        )
+        family = family.union_all(
+            select(RFToken.token_hash, RFToken.replaced_by)
+            .join(family, RFToken.token_hash == family.c.replaced_by)
+        )
+        statement = (
+            update(RFToken)
+            .where(
+                RFToken.token_hash.in_(select(family.c.token_hash)),
+                RFToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        return result.rowcount
+
+    # --- Partition maintenance ---
+
+    async def try_maintenance_lock(self) -> bool:
+        # Advisory lock theo transaction: chỉ một worker chạy maintenance tại một thời điểm
+        result = await self.session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        )
+        return bool(result.scalar())
+
+    async def get_partitions(self) -> list[str]:
+        result = await self.session.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """), {"table": RFToken.__tablename__})
+        return list(result.scalars().all())
+
+    async def ensure_partitions(self, now: datetime, until: datetime, months_ahead: int = 0) -> dict[str, int]:
+        """
+        Tạo partition theo tháng từ tháng hiện tại tới tháng của `until` + months_ahead.
+
+        Trả về {tên partition: số dòng chuyển từ partition DEFAULT sang}. Partition mới được
+        dựng rời, nhận các dòng của tháng đó từ DEFAULT rồi mới ATTACH; CREATE ... PARTITION OF
+        sẽ lỗi nếu DEFAULT đang chứa dòng thuộc khoảng của partition mới.
+        """
+        existing = set(await self.get_partitions())
+        created = {}
+        month_start = _month_start(now)
+        last_month = _add_months(_month_start(until), months_ahead)
+        while month_start <= last_month:
+            name = _partition_name(month_start)
+            if name not in existing:
+                lower, upper = month_start.isoformat(), _add_months(month_start, 1).isoformat()
+                await self.session.execute(text(
+                    f"CREATE TABLE {name} (LIKE {RFToken.__tablename__} INCLUDING DEFAULTS)"
+                ))
+                moved = await self.session.execute(text(f"""
+                    WITH moved AS (
+                        DELETE FROM {DEFAULT_PARTITION}
+                        WHERE expires_at >= '{lower}' AND expires_at < '{upper}'
+                        RETURNING *
+                    ), inserted AS (
+                        INSERT INTO {name} SELECT * FROM moved RETURNING 1
+                    )
+                    SELECT count(*) FROM inserted
+                """))
+                await self.session.execute(text(
+                    f"ALTER TABLE {RFToken.__tablename__} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                ))
+                created[name] = moved.scalar_one()
+            month_start = _add_months(month_start, 1)
+        return created
 
+    async def drop_expired_partitions(self, now: datetime, detach_only: bool = False) -> list[str]:
+        # Partition của tháng M chứa expires_at trong [M, M+1): hết hạn hoàn toàn khi M+1 <= tháng hiện tại
+        current_month = _month_start(now)
+        removed = []
+        for name in await self.get_partitions():
+            suffix = name.removeprefix(PARTITION_PREFIX)
+            if not (name.startswith(PARTITION_PREFIX) and suffix.isdigit() and len(suffix) == 6):
+                continue
+            month_start = date(int(suffix[:4]), int(suffix[4:]), 1)
+            if _add_months(month_start, 1) > current_month:
+                continue
+            await self.session.execute(text(f"ALTER TABLE {RFToken.__tablename__} DETACH PARTITION {name}"))
+            if not detach_only:
+                await self.session.execute(text(f"DROP TABLE {name}"))
+            removed.append(name)
+        return removed
 
+    async def purge_default_partition(self, now: datetime) -> int:
+        # Dòng đã hết hạn còn nằm trong DEFAULT không thuộc partition tháng nào để drop
+        result = await self.session.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE expires_at < :month_start"),
+            {"month_start": _month_start(now)},
+        )
+        return result.rowcount
@@ -2,20 +2,34 @@ from typing import List
 from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy import bindparam
 from sqlmodel import Session, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.models import Role
-from app.db.repositories.base_repository import BaseRepository
+from app.db.models import Role, RolePermission
+from app.db.models.permission_model import DeletedRolePermission
+from app.db.models.role_model import DeletedRole
+from app.db.repositories.base_repository import ArchiveDependent, BaseRepository
+from app.utils import messages
+
+_ROLE_BY_NAME = select(Role).where(Role.name == bindparam("name"))
 
 
 class RoleRepository(BaseRepository[Role]):
+    in_use_message = messages.Role.ROLES_IN_USE
+    archive_model = DeletedRole
+    archive_dependents = (
+        ArchiveDependent(
+            RolePermission, "role_id", DeletedRolePermission,
+            {"original_role_id": "role_id", "original_permission_id": "permission_id"},
+        ),
+    )
+
     def __init__(self, session: AsyncSession):
         super().__init__(Role, session)
 
     async def get_role_by_name(self, name: str):
-        statement = select(Role).where(Role.name == name)
-        role = await self.session.execute(statement)
+        role = await self.session.execute(_ROLE_BY_NAME, {"name": name})
         return role.scalars().first()
 
     async def get_roles_by_names(self, names: List[str]) -> List[Role]:
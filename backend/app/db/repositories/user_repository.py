@@ -1,53 +1,156 @@
 import logging
-from typing import Optional
+from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.models import User, Role
+from app.core.principal_cache import principal_cache
+from app.db.models import RFToken, Role, User
 from app.db.models.user_model import DeletedUser
-from app.db.repositories.base_repository import BaseRepository
-from app.utils.logger import get_logger, Module
+from app.db.repositories.base_repository import ArchiveDependent, BaseRepository
+from app.schemas.response_schema import Cursor
+from app.schemas.user_schema import UserCredentials, UserPrincipal
+from app.utils import messages
+from app.utils.enums import CountStrategy
+from app.utils.logger import Module, get_logger
 
 logger = get_logger(Module.USER_REPO)
 
+# Câu truy vấn nóng dựng sẵn một lần: mỗi lần gọi chỉ bind tham số, không dựng lại select()
+# và cache key của SQLAlchemy được tính một lần trên cùng object
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_CREDENTIALS_BY_EMAIL = select(
+    User.id, User.email, User.role_id, User.verified, User.token_version, User.password_hash
+).where(User.email == bindparam("email"))
+_PRINCIPAL_BY_ID = select(
+    User.id, User.email, User.role_id, User.verified, User.token_version
+).where(User.id == bindparam("user_id"))
+
 
 class UserRepository(BaseRepository[User]):
+    # email là cột unique duy nhất ngoài khóa chính
+    duplicate_message = messages.User.EMAIL_ALREADY_EXISTS
+    archive_model = DeletedUser
+    archive_columns = {
+        "original_id": "id",
+        "archived_role_id": "role_id",
+        # deleted_users.verify_token NOT NULL, còn user đã xác minh thì verify_token là NULL
+        "verify_token": lambda c: func.coalesce(c.verify_token, ""),
+    }
+    # refresh token của user bị archive không còn giá trị, chỉ xóa
+    archive_dependents = (ArchiveDependent(RFToken, "user_id"),)
+
     def __init__(self, session: AsyncSession):
         super().__init__(User, session)
 
-    async def get_user_by_email(self, email: str) -> Optional[User]:
-        statement = select(User).where(
-            User.email == email
-        )
-        user = await self.session.execute(statement)
+    async def get_user_by_email(self, email: str) -> User | None:
+        user = await self.session.execute(_USER_BY_EMAIL, {"email": email})
         return user.scalars().first()
 
-    async def get_all_users(self, offset: int, size: int):
+    async def get_credentials_by_email(self, email: str) -> UserCredentials | None:
+        # Đăng nhập chỉ cần vài cột, không nạp cả entity User vào session
+        result = await self.session.execute(_CREDENTIALS_BY_EMAIL, {"email": email})
+        row = result.first()
+        return UserCredentials.model_validate(row._mapping) if row else None
+
+    async def get_principal(self, user_id) -> UserPrincipal | None:
+        result = await self.session.execute(_PRINCIPAL_BY_ID, {"user_id": user_id})
+        row = result.first()
+        return UserPrincipal.model_validate(row._mapping) if row else None
+
+    async def get_all_users(self, offset: int, size: int, count_strategy: CountStrategy = CountStrategy.EXACT):
+        # Chế độ tương thích (OFFSET); trang sâu chậm dần, ưu tiên get_users_page
         statement = (
             select(User, Role.name.label("role"))
             .join(Role, User.role_id == Role.id)
-            .order_by(User.created_at.desc())
+            .order_by(User.created_at.desc(), User.id.desc())
             .offset(offset)
-            .limit(size)
+            .limit(size + 1)
         )
-        count_stmt = select(func.count()).select_from(User)
+        result = await self.session.execute(statement)
+        users = result.all()
+        has_next = len(users) > size
+        users = users[:size]
+        next_cursor, prev_cursor = self.boundary_cursors(users, has_next, offset > 0)
+        return users, next_cursor, prev_cursor, await self.count(count_strategy)
 
-        user_result = await self.session.exec(statement)
-        count_result = await self.session.exec(count_stmt)
+    async def get_users_page(self, size: int, cursor: Cursor | None = None,
+                             count_strategy: CountStrategy = CountStrategy.EXACT):
+        statement = select(User, Role.name.label("role")).join(Role, User.role_id == Role.id)
+        rows, next_cursor, prev_cursor = await self.get_page(size=size, cursor=cursor, statement=statement)
+        return rows, next_cursor, prev_cursor, await self.count(count_strategy)
 
-        users = user_result.all()
-        total_items = count_result.one_or_none()
+    async def set_reset_nonce(self, email: str, nonce: str, expires_at) -> UUID | None:
+        # Mỗi lần yêu cầu reset thay nonce mới, link cũ tự mất hiệu lực
+        statement = (
+            update(User)
+            .where(User.email == email)
+            .values(pwd_reset_token=nonce, pwd_reset_expire=expires_at)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
 
-        return users, total_items
+    async def consume_verify_nonce(self, user_id, nonce: str) -> bool:
+        # Tra theo khóa chính + compare-and-set: link chỉ dùng được một lần
+        statement = (
+            update(User)
+            .where(User.id == user_id, User.verify_token == nonce)
+            .values(verified=True, verify_token=None, verify_token_expire=None)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        consumed = result.scalar_one_or_none() is not None
+        if consumed:
+            principal_cache.invalidate_after_commit(self.session, user_id)
+        return consumed
+
+    async def consume_reset_nonce(self, user_id, nonce: str, password_hash: str) -> bool:
+        # Đổi mật khẩu đồng thời tăng token_version để refresh token cũ hết hiệu lực
+        statement = (
+            update(User)
+            .where(User.id == user_id, User.pwd_reset_token == nonce)
+            .values(
+                password_hash=password_hash,
+                pwd_reset_token=None,
+                pwd_reset_expire=None,
+                token_version=User.token_version + 1,
+            )
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        consumed = result.scalar_one_or_none() is not None
+        if consumed:
+            principal_cache.invalidate_after_commit(self.session, user_id)
+        return consumed
+
+    async def bump_token_version(self, user_id, **values) -> str | None:
+        # Gọi khi đổi role hoặc khóa tài khoản: token đã cấp với version cũ sẽ không được làm mới.
+        # `values` là các cột đổi cùng lúc (vd. role_id); trả về email, None nếu không có user
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**values, token_version=User.token_version + 1)
+            .returning(User.email)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(statement)
+        principal_cache.invalidate_after_commit(self.session, user_id)
+        return result.scalar_one_or_none()
 
-    async def get_user_by_token(self, token: str) -> User:
-        statement = select(User).where(User.verify_token == token)
-        user = await self.session.execute(statement)
+    async def update(self, instance: User):
+        principal_cache.invalidate_after_commit(self.session, instance.id)
+        return await super().update(instance)
 
-        return user.scalar_one_or_none()
+    async def archive_many(self, ids, batch_size=None) -> list[UUID]:
+        for user_id in ids:
+            principal_cache.invalidate_after_commit(self.session, user_id)
+        return await super().archive_many(ids, batch_size)
 
 
 class DeletedUserRepository(BaseRepository[DeletedUser]):
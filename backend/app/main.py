@@ -1,7 +1,8 @@
+import asyncio
 import logging
 import time
+from contextlib import asynccontextmanager
 
-import sentry_sdk
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.routing import APIRoute
@@ -10,12 +11,34 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
 from app.api.main import api_router
+from app.core import sql_metrics
 from app.core.config import settings
-from app.core.exceptions import NotFoundError, DuplicateEntryError, ApplicationError
-from app.utils.handlers import http_exception_handler, general_exception_handler, integrity_error_handler, \
-    sqlalchemy_error_handler, not_found_error_handler, duplicate_entry_error_handler, application_error_handler, \
-    validation_exception_handler
-from app.utils.logger import get_logger, Module
+from app.core.db import AsyncSessionLocal, database
+from app.core.default_role import default_role
+from app.core.exceptions import (
+    ApplicationError,
+    DeadlineExceededError,
+    DuplicateEntryError,
+    NotFoundError,
+    ServiceOverloadedError,
+)
+from app.core.password_pool import password_pool
+from app.core.permission_catalog import sync_permission_catalog
+from app.core.replicas import replica_router
+from app.services.maintenance_service import run_maintenance_loop
+from app.utils.handlers import (
+    application_error_handler,
+    deadline_exceeded_error_handler,
+    duplicate_entry_error_handler,
+    general_exception_handler,
+    http_exception_handler,
+    integrity_error_handler,
+    not_found_error_handler,
+    service_overloaded_error_handler,
+    sqlalchemy_error_handler,
+    validation_exception_handler,
+)
+from app.utils.logger import Module, get_logger
 
 logger = get_logger(Module.APP)
 
@@ -25,21 +48,42 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
+    import sentry_sdk
+
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    logger.info("Docs: http://127.0.0.1:8000/docs")
+    password_pool.start()
+    async with AsyncSessionLocal() as session:
+        if await default_role.load(session) is None:
+            logger.warning(f"Default role '{default_role.name}' not found, will retry on first registration")
+        if settings.PERMISSION_CATALOG_SYNC:
+            await sync_permission_catalog(session)
+            await session.commit()
+    maintenance_task = asyncio.create_task(run_maintenance_loop())
+    replica_health_task = asyncio.create_task(replica_router.run_health_loop()) if replica_router.replicas else None
+    yield
+    maintenance_task.cancel()
+    if replica_health_task:
+        replica_health_task.cancel()
+    await replica_router.dispose()
+    await database.dispose()
+    password_pool.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Docs: http://127.0.0.1:8000/docs")
-
 app.add_exception_handler(NotFoundError, not_found_error_handler)
 app.add_exception_handler(DuplicateEntryError, duplicate_entry_error_handler)
+app.add_exception_handler(ServiceOverloadedError, service_overloaded_error_handler)
+app.add_exception_handler(DeadlineExceededError, deadline_exceeded_error_handler)
 app.add_exception_handler(ApplicationError, application_error_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(IntegrityError, integrity_error_handler)
@@ -61,12 +105,25 @@ if settings.all_cors_origins:
 @app.middleware("http")
 async def log_process_time(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
+    sql_stats, sql_token = sql_metrics.start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        sql_metrics.end_request(sql_token)
     duration = time.time() - start_time
 
     log_message = f"{request.method} {request.url.path} took {round(duration * 1000, 2)}ms"
-    logger.info(log_message)
-
+    log_message += f" (sql: {sql_stats.count} queries, {sql_stats.ms}ms"
+    request_session = getattr(request.state, "db", None)
+    if request_session is not None:
+        log_message += f", db checkouts: {request_session.checkouts}"
+    logger.info(log_message + ")")
+    sql_metrics.report(sql_stats, request.method, request.url.path)
+
+    if settings.SERVER_TIMING:
+        response.headers["Server-Timing"] = (
+            f'db;dur={sql_stats.ms};desc="{sql_stats.count} queries", total;dur={round(duration * 1000, 2)}'
+        )
     return response
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
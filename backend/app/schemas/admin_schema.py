@@ -1,6 +1,6 @@
 import re
 from datetime import date
-from typing import Optional
+from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, constr, field_validator
 
@@ -29,7 +29,7 @@ class AdminUserCreate(BaseModel):
     gender: Gender = Field(
         ..., example=Gender.MALE,
         description="Giới tính")
-    address: Optional[constr(max_length=255)] = Field(
+    address: constr(max_length=255) | None = Field(
         None, example="123 Main St, Anytown",
         description="Địa chỉ (tùy chọn).")
 
@@ -42,4 +42,13 @@ class AdminUserCreate(BaseModel):
         pattern = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*()_+{}\[\]:;<>,.?/~\\-]).{8,20}$"
         if not re.match(pattern, value):
             raise ValueError("Mật khẩu phải chứa ít nhất một chữ hoa, một chữ thường, một số và một ký tự đặc biệt.")
-        return value
\ No newline at end of file
+        return value
+
+
+class AdminUserRoleUpdate(BaseModel):
+    role: str = Field(..., example=constants.DEFAULT_ROLE.value, description="Tên role mới của người dùng")
+
+
+class AdminBulkDeleteResult(BaseModel):
+    deleted: int = Field(..., description="Số user đã xóa (chuyển sang deleted_users)")
+    not_found: list[UUID] = Field(default_factory=list, description="Các id không tồn tại")
@@ -7,6 +7,13 @@ from pydantic import BaseModel, EmailStr, Field, constr, field_validator, valida
 from app.utils.enums import Gender
 
 
+def _validate_password(value: str) -> str:
+    pattern = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*()_+{}\[\]:;<>,.?/~\\-]).{8,20}$"
+    if not re.match(pattern, value):
+        raise ValueError("Mật khẩu phải chứa ít nhất một chữ hoa, một chữ thường, một số và một ký tự đặc biệt.")
+    return value
+
+
 class RegisterRequest(BaseModel):
     email: EmailStr = Field(..., example="user@example.com",
                             description="Địa chỉ email của người dùng, phải là duy nhất.")
@@ -34,10 +41,7 @@ class RegisterRequest(BaseModel):
 
     @field_validator('password')
     def validate_password(cls, value):
-        pattern = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*()_+{}\[\]:;<>,.?/~\\-]).{8,20}$"
-        if not re.match(pattern, value):
-            raise ValueError("Mật khẩu phải chứa ít nhất một chữ hoa, một chữ thường, một số và một ký tự đặc biệt.")
-        return value
+        return _validate_password(value)
 
 
 class LoginRequest(BaseModel):
@@ -56,6 +60,10 @@ class LoginResponse(BaseModel):
     access_token: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., description="Refresh token issued at login or by a previous refresh")
+
+
 class VerifyRequest(BaseModel):
     email: EmailStr
     token: str
@@ -67,4 +75,13 @@ class ResendRequest(BaseModel):
 
 
 class EmailRequest(BaseModel):
-    email: EmailStr
\ No newline at end of file
+    email: EmailStr
+
+
+class ResetPasswordRequest(BaseModel):
+    token: str = Field(..., description="Token from the password reset link")
+    new_password: str = Field(..., min_length=8, max_length=20, example="SecureP@ssw0rd!")
+
+    @field_validator('new_password')
+    def validate_new_password(cls, value):
+        return _validate_password(value)
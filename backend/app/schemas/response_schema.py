@@ -1,16 +1,22 @@
+import base64
 import math
-from typing import TypeVar, Generic, Optional, List
+from datetime import datetime
+from typing import Generic, TypeVar
 
 from fastapi import Query
-from pydantic import BaseModel, Field, computed_field
+from pydantic import BaseModel, Field, ValidationError, computed_field
+
+from app.core.exceptions import ApplicationError
+from app.utils import messages
+from app.utils.enums import CountStrategy
 
 DataT = TypeVar('DataT')
 
 
 class ErrorDetail(BaseModel):
-    loc: Optional[List[str]] = None
+    loc: list[str] | None = None
     msg: str
-    type: Optional[str] = None
+    type: str | None = None
 
     model_config = {
         "exclude_none": True
@@ -19,8 +25,8 @@ class ErrorDetail(BaseModel):
 
 class ErrorResponse(BaseModel):
     code: str = Field(..., description="Mã lỗi nội bộ hoặc chung")
-    message: Optional[str] = Field(None, description="Thông báo lỗi tổng quan cho người dùng")
-    details: Optional[List[ErrorDetail]] = Field(None, description="Chi tiết lỗi cụ thể (thường cho validation)")
+    message: str | None = Field(None, description="Thông báo lỗi tổng quan cho người dùng")
+    details: list[ErrorDetail] | None = Field(None, description="Chi tiết lỗi cụ thể (thường cho validation)")
 
     model_config = {
         "exclude_none": True
@@ -30,11 +36,39 @@ class ErrorResponse(BaseModel):
 class PaginationParams(BaseModel):
     page: int = Query(1, ge=1, description="Page number (starting from 1)")
     size: int = Query(10, ge=1, le=100, description="Page size (number of items per page)")
+    cursor: str | None = Query(
+        None, description="Opaque cursor from meta.next_cursor/prev_cursor. When set, `page` is ignored"
+    )
+    count: CountStrategy = Query(
+        CountStrategy.EXACT, description="How total_items is computed: exact, estimated, cached or none"
+    )
 
     @property
     def offset(self):
         return (self.page - 1) * self.size
 
+
+class Cursor(BaseModel):
+    """Vị trí keyset (created_at, id) của phần tử biên trang, mã hóa base64url để client coi là opaque."""
+    created_at: datetime
+    id: str
+    backward: bool = False
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, value: str, id_type: type = str) -> "Cursor":
+        # id_type: kiểu khóa chính của model (vd. UUID); cursor bị sửa phải thành 400 ở đây,
+        # không được tới DB rồi thành DataError (503)
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            cursor = cls.model_validate_json(raw)
+            cursor.id = str(id_type(cursor.id))
+            return cursor
+        except (ValueError, ValidationError):
+            raise ApplicationError(messages.INVALID_CURSOR)
+
 # Redundant class
 # class Page:
 #     def __init__(self, params: PaginationParams):
@@ -44,13 +78,20 @@ class PaginationParams(BaseModel):
 
 
 class PaginationMeta(BaseModel):
-    page: int = Field(..., ge=1)
+    # page = None khi phân trang bằng cursor
+    page: int | None = Field(None, ge=1)
     size: int = Field(..., ge=1)
-    total_items: int = Field(..., ge=0)
+    # total_items = None khi count_strategy là none; với estimated chỉ là số gần đúng
+    total_items: int | None = Field(None, ge=0)
+    count_strategy: CountStrategy = CountStrategy.EXACT
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
     @computed_field
     @property
-    def total_pages(self) -> int:
+    def total_pages(self) -> int | None:
+        if self.total_items is None:
+            return None
         if self.total_items == 0:
             return 0
         return math.ceil(self.total_items / self.size)
@@ -58,39 +99,42 @@ class PaginationMeta(BaseModel):
     @computed_field
     @property
     def has_next_page(self) -> bool:
-        return self.page < self.total_pages
+        # Trang luôn lấy thêm một dòng để biết còn trang sau, không phụ thuộc total_items
+        return self.next_cursor is not None
 
     @computed_field
     @property
     def has_prev_page(self) -> bool:
+        if self.page is None:
+            return self.prev_cursor is not None
         return self.page > 1
 
     @computed_field
     @property
-    def next_page_number(self) -> Optional[int]:
-        if self.has_next_page:
+    def next_page_number(self) -> int | None:
+        if self.page is not None and self.has_next_page:
             return self.page + 1
         return None
 
     @computed_field
     @property
-    def prev_page_number(self) -> Optional[int]:
-        if self.has_prev_page:
+    def prev_page_number(self) -> int | None:
+        if self.page is not None and self.has_prev_page:
             return self.page - 1
         return None
 
 
 class Pagination(BaseModel, Generic[DataT]):
-    data: Optional[DataT] = None
-    meta: Optional[PaginationMeta] = None
+    data: DataT | None = None
+    meta: PaginationMeta | None = None
 
 
 class ModelResponse(BaseModel, Generic[DataT]):
     success: bool = True
-    message: Optional[str] = None
-    data: Optional[DataT] = None
-    meta: Optional[PaginationMeta] = None
-    error: Optional[ErrorResponse] = None
+    message: str | None = None
+    data: DataT | None = None
+    meta: PaginationMeta | None = None
+    error: ErrorResponse | None = None
 
     model_config = {
         "exclude_none": True
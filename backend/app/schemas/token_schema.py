@@ -14,6 +14,16 @@ from pydantic import BaseModel
 
 class TokenPayload(BaseModel):
     sub: UUID | None = None
+    tv: int | None = None
+
+
+class TokenPrincipal(BaseModel):
+    """Principal đọc trực tiếp từ access token (STATELESS_AUTH), không cần truy vấn DB."""
+    sub: UUID
+    rid: int
+    ver: bool
+    perm: int
+    tv: int
 
 
 class VerifyToken:
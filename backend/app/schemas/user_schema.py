@@ -42,6 +42,25 @@ class UserCreate(BaseModel):
         return value
 
 
+class UserPrincipal(BaseModel):
+    """Phần tối thiểu của user mà các dependency xác thực cần."""
+    id: UUID
+    email: EmailStr
+    role_id: int
+    verified: bool
+    token_version: int
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True
+    }
+
+
+class UserCredentials(UserPrincipal):
+    """Principal kèm password_hash, chỉ dùng cho luồng đăng nhập."""
+    password_hash: str
+
+
 class UserResponse(BaseModel):
     id: UUID
     email: EmailStr
@@ -1,35 +1,50 @@
 import asyncio
-from datetime import datetime, timezone, timedelta
-from typing import List
-from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
 from fastapi import BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.core.exceptions import NotFoundError, DuplicateEntryError
-from app.core.security import get_token_hash, get_password_hash
+from app.core.exceptions import ApplicationError, DuplicateEntryError, NotFoundError
+from app.core.security import generate_link_nonce, get_password_hash
 from app.db.models import User
 from app.db.repositories.role_repository import RoleRepository
 from app.db.repositories.user_repository import UserRepository
-from app.schemas.admin_schema import AdminUserCreate
-from app.schemas.response_schema import PaginationMeta, Pagination, PaginationParams
+from app.schemas.admin_schema import (
+    AdminBulkDeleteResult,
+    AdminUserCreate,
+    AdminUserRoleUpdate,
+)
+from app.schemas.response_schema import (
+    Cursor,
+    Pagination,
+    PaginationMeta,
+    PaginationParams,
+)
 from app.schemas.user_schema import UserResponse
 from app.services.unit_of_work import UnitOfWork
 from app.utils import messages
 from app.utils.email_service import send_email
 from app.utils.enums import EmailType
-from app.utils.token_utils import generate_token
+from app.utils.token_utils import build_verification_url
+
+USER_RESPONSE_COLUMNS = (
+    "id", "email", "fullname", "dob", "address", "avatar", "gender", "verified", "role_id", "created_at", "updated_at"
+)
 
 
 class AdminService:
 
     async def get_user(self, uow: UnitOfWork, id: UUID) -> UserResponse:
-        async with uow:
-            existing_user = await uow.users.get_by_id(id)
+        async with uow.read_only():
+            # Một câu SELECT: user (chỉ các cột cần trả về) JOIN role
+            existing_user = await uow.users.get_by_id(
+                id, load={"role": "joined"}, columns=USER_RESPONSE_COLUMNS, raise_on_lazy=True
+            )
             if not existing_user:
                 raise NotFoundError(messages.User.USER_NOT_FOUND)
-            role = await uow.roles.get_by_id(existing_user.role_id)
+            role = existing_user.role
             if not role:
                 raise NotFoundError(messages.Role.ROLE_NOT_FOUND)
 
@@ -50,13 +65,28 @@ class AdminService:
         response = UserResponse.model_validate(user_data)
         return response
 
-    async def get_all_users(self, uow: UnitOfWork, params: PaginationParams) -> Pagination[List[UserResponse]]:
-        offset = params.offset
+    async def get_all_users(self, uow: UnitOfWork, params: PaginationParams) -> Pagination[list[UserResponse]]:
         size = params.size
-        page = params.page
-        async with uow:
-            users, total_items = await uow.users.get_all_users(offset, size)
-
+        cursor = Cursor.decode(params.cursor, id_type=UUID) if params.cursor else None
+        async with uow.read_only():
+            if cursor is not None:
+                users, next_cursor, prev_cursor, total = await uow.users.get_users_page(
+                    size, cursor, params.count
+                )
+            else:
+                users, next_cursor, prev_cursor, total = await uow.users.get_all_users(
+                    params.offset, size, params.count
+                )
+
+        meta = PaginationMeta(
+            page=None if cursor is not None else params.page,
+            size=size,
+            total_items=total.total,
+            # Cách đếm thực sự đã dùng: estimated/cached có thể rơi về exact
+            count_strategy=total.strategy,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
+        )
         user_responses = [
             UserResponse(
                 **user.model_dump(),
@@ -67,35 +97,20 @@ class AdminService:
 
         response = Pagination(
             data=user_responses,
-            meta=PaginationMeta(
-                page=page,
-                size=size,
-                total_items=total_items
-            )
+            meta=meta
         )
 
         return response
 
     async def create_user(self, uow: UnitOfWork, user_in: AdminUserCreate, background_tasks: BackgroundTasks):
+        # Hash trước khi mở UnitOfWork: không giữ connection trong lúc chờ bcrypt
+        password_hash = await get_password_hash(user_in.password)
         async with uow:
-            # existing_user = await self.user_repo.get_user_by_email(user_in.email)
-            # if existing_user:
-            #     raise DuplicateEntryError(messages.User.EMAIL_ALREADY_EXISTS)
             existing_role = await uow.roles.get_role_by_name(user_in.role)
             if not existing_role:
                 raise NotFoundError(messages.Role.ROLE_NOT_FOUND)
 
-            user_data = user_in.model_dump(exclude={"password", "role"})
-            password_hash = await get_password_hash(user_in.password)
-            token = await generate_token()
-            hashed_token = await get_token_hash(token)
-            user = User(
-                **user_data,
-                password_hash=password_hash,
-                role_id=existing_role.id,
-                verify_token=hashed_token,
-                verify_token_expire=datetime.now(timezone.utc) + timedelta(seconds=settings.VERIFY_TOKEN_EXPIRES)
-            )
+            user, nonce = self._map_user(user_in, existing_role.id, password_hash)
             await uow.users.create(user)
 
         # Context data
@@ -103,16 +118,20 @@ class AdminService:
         email_context = {
             "subject": subject,
             "user_email_placeholder": user_in.email,
-            "token": token,
+            "verification_url": build_verification_url(user.id, nonce),
         }
         background_tasks.add_task(
             send_email, user.email, subject, EmailType.VERIFY_ACCOUNT.value, email_context
         )
 
-    async def create_many_user(self, uow: UnitOfWork, user_list: List[AdminUserCreate], background_tasks: BackgroundTasks):
+    async def create_many_user(self, uow: UnitOfWork, user_list: list[AdminUserCreate], background_tasks: BackgroundTasks):
         if not user_list:
             return
 
+        # Hash trước khi mở UnitOfWork: không giữ connection trong lúc chờ bcrypt
+        password_hashes = await asyncio.gather(
+            *(get_password_hash(user_in.password, admission=False) for user_in in user_list)
+        )
         async with uow:
             unique_role_names = {user.role for user in user_list}
             role_list = await uow.roles.get_roles_by_names(list(unique_role_names))
@@ -122,23 +141,20 @@ class AdminService:
                 if role_name not in role_map:
                     raise NotFoundError(messages.Role.ROLE_NOT_FOUND)
 
-            mapping_tasks = []
-            for user_in in user_list:
-                role_id = role_map[user_in.role]
-                task = self._map_user(user_in, role_id)
-                mapping_tasks.append(task)
-
-            mapped_results = await asyncio.gather(*mapping_tasks)
-            users = [result[0] for result in mapped_results]
-            users_dict = [user.dict(exclude_unset=True) for user in users]
-            await uow.users.create_many(users_dict)
+            mapped_results = [
+                self._map_user(user_in, role_map[user_in.role], password_hash)
+                for user_in, password_hash in zip(user_list, password_hashes, strict=True)
+            ]
+            users_dict = [user.dict(exclude_unset=True) for user, _ in mapped_results]
+            # id đã gán sẵn, không cần RETURNING nên đi đường COPY
+            await uow.users.create_many(users_dict, returning=False)
 
-        for user_model, raw_token in mapped_results:
+        for user_model, nonce in mapped_results:
             subject = "Verify Your Account"
             email_context = {
                 "subject": subject,
                 "user_email_placeholder": user_model.email,
-                "token": raw_token,
+                "verification_url": build_verification_url(user_model.id, nonce),
             }
             background_tasks.add_task(
                 send_email,
@@ -148,19 +164,53 @@ class AdminService:
                 email_context,
             )
 
-    async def _map_user(self, user_in: AdminUserCreate, role_id: int):
+    async def change_user_role(self, uow: UnitOfWork, id: UUID, role_in: AdminUserRoleUpdate, current_user_id: UUID) -> str:
+        if id == current_user_id:
+            raise ApplicationError(messages.User.CANNOT_CHANGE_OWN_ROLE)
+        async with uow:
+            role = await uow.roles.get_role_by_name(role_in.role)
+            if not role:
+                raise NotFoundError(messages.Role.ROLE_NOT_FOUND)
+            # Cùng câu UPDATE tăng token_version: access token (claims) cũ không được làm mới với role cũ
+            email = await uow.users.bump_token_version(id, role_id=role.id)
+            if email is None:
+                raise NotFoundError(messages.User.USER_NOT_FOUND)
+        return email
+
+    async def delete_user(self, uow: UnitOfWork, id: UUID, current_user_id: UUID):
+        if id == current_user_id:
+            raise ApplicationError(messages.User.CANNOT_DELETE_SELF)
+        async with uow:
+            if not await uow.users.delete(id):
+                raise NotFoundError(messages.User.USER_NOT_FOUND)
+
+    async def delete_many_users(
+        self, uow: UnitOfWork, ids: list[UUID], current_user_id: UUID
+    ) -> AdminBulkDeleteResult:
+        if current_user_id in ids:
+            raise ApplicationError(messages.User.CANNOT_DELETE_SELF)
+        unique_ids = list(dict.fromkeys(ids))
+        async with uow:
+            # Mỗi batch một câu lệnh: xóa refresh token, chuyển user sang deleted_users
+            archived = set(await uow.users.archive_many(unique_ids))
+        return AdminBulkDeleteResult(
+            deleted=len(archived),
+            not_found=[user_id for user_id in unique_ids if user_id not in archived],
+        )
+
+    def _map_user(self, user_in: AdminUserCreate, role_id: int, password_hash: str) -> tuple[User, str]:
         user_data = user_in.model_dump(exclude={"password", "role"})
-        password_hash = await get_password_hash(user_in.password)
-        token = await generate_token()
-        hashed_token = await get_token_hash(token)
+        nonce = generate_link_nonce()
+        # id gán tường minh để nằm trong dict exclude_unset và khớp với link xác minh
         user = User(
             **user_data,
+            id=uuid4(),
             password_hash=password_hash,
             role_id=role_id,
-            verify_token=hashed_token,
+            verify_token=nonce,
             verify_token_expire=datetime.now(timezone.utc) + timedelta(seconds=settings.VERIFY_TOKEN_EXPIRES)
         )
-        return user, token
+        return user, nonce
 
 
 def get_admin_service():
@@ -7,148 +7,171 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.exceptions import NotFoundError, DuplicateEntryError
-from app.core.security import get_password_hash, get_token_hash, verify_password, verify_token
+from app.core.exceptions import NotFoundError, InvalidTokenError
+from app.core.default_role import default_role
+from app.core.permission_cache import permission_cache
+from app.core.principal_cache import principal_cache
+from app.core.security import get_password_hash, get_token_hash, verify_password
 from app.db.models import User, RFToken
-from app.schemas.auth_schema import RegisterRequest, LoginRequest, VerifyRequest, LoginResponse, EmailRequest
+from app.schemas.auth_schema import RegisterRequest, LoginRequest, VerifyRequest, LoginResponse, EmailRequest, \
+    RefreshRequest, ResetPasswordRequest
 from app.schemas.token_schema import VerifyToken
+from app.schemas.user_schema import UserPrincipal
 from app.services.unit_of_work import UnitOfWork
 from app.utils import messages
-from app.utils.constants import DEFAULT_ROLE
 from app.utils.email_service import send_email
-from app.utils.enums import EmailType, Module
+from app.utils.enums import EmailType, Module, TokenType
 from app.utils.logger import get_logger
-from app.utils.token_utils import generate_token, generate_jwt_token, get_client_meta
+from app.utils.token_utils import generate_token, generate_jwt_token, get_client_meta, build_principal_claims, \
+    decode_jwt_token, build_verification_url
 
 logger = get_logger(Module.AUTH_SERVICE)
 
 
 class AuthService:
     async def register(self, uow: UnitOfWork, user_in: RegisterRequest, background_tasks: BackgroundTasks) -> None:
-        logger.info("Check user exist")
+        # Không SELECT kiểm tra email trước (issue #3): INSERT vi phạm unique sẽ thành DuplicateEntryError
+        password_hash = await get_password_hash(user_in.password)
+        user_data = user_in.model_dump(exclude={"password"})
+        nonce = security.generate_link_nonce()
+
+        logger.info("In transaction create user")
         async with uow:
-            existing_user = await uow.users.get_user_by_email(user_in.email)
-            if existing_user:
-                raise DuplicateEntryError(messages.User.EMAIL_ALREADY_EXISTS)
-            password_hash = await get_password_hash(user_in.password)
-
-            logger.info("In transaction create user")
-            user_data = user_in.model_dump(exclude={"password"})
-            existing_role = await uow.roles.get_role_by_name(DEFAULT_ROLE)
-            # if not existing_role:
-            #     # raise SystemConfigurationError(...)
-            token = security.generate_token()
-            hashed_token = security.get_token_hash(token)
             user = User(
                 **user_data,
                 password_hash=password_hash,
-                role_id=existing_role.id,
-                verify_token=hashed_token,
+                role_id=await default_role.get_id(uow.session),
+                verify_token=nonce,
                 verify_token_expire=datetime.now(timezone.utc) + timedelta(seconds=settings.VERIFY_TOKEN_EXPIRES)
             )
             await uow.users.create(user)
         logger.info("End transaction")
         logger.info("Send email to user")
-        # Context data
-        subject = "Verify Your Account"
-        verification_url = f"{settings.PROJECT_URL}/email/verify?token={token}"
-        email_context = {
-            "subject": subject,
-            "user_email_placeholder": user_in.email,
-            "verification_url": verification_url,
-        }
-        background_tasks.add_task(
-            send_email, user.email, subject, EmailType.VERIFY_ACCOUNT.value, email_context
-        )
+        self._send_verification_email(background_tasks, user.id, user.email, nonce)
 
     async def login(self, uow: UnitOfWork, login: LoginRequest, request: Request) -> LoginResponse:
+        # Hai câu lệnh DB: SELECT vài cột của user, INSERT ... RETURNING refresh token.
+        # Không giữ connection trong lúc chờ bcrypt và ký JWT. Đọc từ primary, không qua replica:
+        # replica trễ ngay sau verify/reset password sẽ trả `verified`/`token_version` cũ.
         async with uow:
-            existing_user = await uow.users.get_user_by_email(login.email)
+            credentials = await uow.users.get_credentials_by_email(login.email)
 
-        if not existing_user:
+        if not credentials:
             raise NotFoundError(messages.User.USER_NOT_FOUND)
-        match = await verify_password(login.password, existing_user.password_hash)
+        match = await verify_password(login.password, credentials.password_hash)
         if not match:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=messages.Auth.LOGIN_FAILED
             )
 
-        if not existing_user.verified:
+        if not credentials.verified:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=messages.Auth.ACCOUNT_NOT_YET_ACTIVE
             )
 
-        refresh_token_task = generate_jwt_token(existing_user.id, settings.REFRESH_TOKEN_EXPIRES)
-        access_token_task = generate_jwt_token(existing_user.id, settings.ACCESS_TOKEN_EXPIRES)
+        access_claims = await self._build_access_claims(uow, credentials)
+        refresh_token_task = generate_jwt_token(
+            credentials.id, settings.REFRESH_TOKEN_EXPIRES, TokenType.REFRESH, {"tv": credentials.token_version}
+        )
+        access_token_task = generate_jwt_token(
+            credentials.id, settings.ACCESS_TOKEN_EXPIRES, TokenType.ACCESS, access_claims
+        )
         refresh_token, access_token = await asyncio.gather(
             refresh_token_task,
             access_token_task
         )
+        save_token = self._build_refresh_token(credentials.id, refresh_token, request)
         async with uow:
-            save_token = self._build_refresh_token(existing_user.id, refresh_token, request)
-            await uow.rftoken.create(save_token)
+            await uow.rftoken.add(save_token)
         return LoginResponse(
             refresh_token=refresh_token,
             access_token=access_token
         )
 
-    def _build_refresh_token(self, user_id: uuid.UUID, refresh_token: str, request: Request) -> RFToken:
-        token_hash = get_token_hash(refresh_token)
-        ip, user_agent = get_client_meta(request)
-        return RFToken(
-            user_id=user_id,
-            token_hash=token_hash,
-            expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRES),
-            ip_address=ip,
-            user_agent=user_agent,
+    async def refresh(self, uow: UnitOfWork, refresh_in: RefreshRequest, request: Request) -> LoginResponse:
+        payload = await decode_jwt_token(refresh_in.refresh_token, TokenType.REFRESH)
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=messages.Auth.REFRESH_TOKEN_INVALID
+            )
+        user_id = uuid.UUID(payload["sub"])
+        token_version = payload.get("tv", 0)
+        token_hash = get_token_hash(refresh_in.refresh_token)
+
+        new_refresh_token = await generate_jwt_token(
+            user_id, settings.REFRESH_TOKEN_EXPIRES, TokenType.REFRESH, {"tv": token_version}
         )
+        save_token = self._build_refresh_token(user_id, new_refresh_token, request)
 
-    async def oauth2_login(self, uow: UnitOfWork, login: LoginRequest, request: Request):
         async with uow:
-            logger.info("IN UOW 1")
-            existing_user = await uow.users.get_user_by_email(login.email)
-        if not existing_user:
-            raise NotFoundError(messages.User.USER_NOT_FOUND)
-        match = await verify_password(login.password, existing_user.password_hash)
-        if not match:
+            owner_id = await uow.rftoken.rotate(token_hash, save_token.token_hash)
+            if owner_id is None:
+                revoked = await uow.rftoken.revoke_family(token_hash)
+            else:
+                principal = principal_cache.get(owner_id) or await uow.users.get_principal(owner_id)
+                if not principal or owner_id != user_id or principal.token_version != token_version:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail=messages.Auth.REFRESH_TOKEN_INVALID
+                    )
+                await uow.rftoken.add(save_token)
+
+        if owner_id is None:
+            if revoked:
+                logger.warning(f"Refresh token reuse detected for user {user_id}, revoked {revoked} token(s)")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=messages.Auth.LOGIN_FAILED
+                detail=messages.Auth.REFRESH_TOKEN_INVALID
             )
 
-        if not existing_user.verified:
+        if not principal.verified:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=messages.Auth.ACCOUNT_NOT_YET_ACTIVE
             )
 
-        refresh_token_task = generate_jwt_token(existing_user.id, settings.REFRESH_TOKEN_EXPIRES)
-        access_token_task = generate_jwt_token(existing_user.id, settings.ACCESS_TOKEN_EXPIRES)
-        refresh_token, access_token = await asyncio.gather(
-            refresh_token_task,
-            access_token_task
+        access_claims = await self._build_access_claims(uow, principal)
+        access_token = await generate_jwt_token(user_id, settings.ACCESS_TOKEN_EXPIRES, TokenType.ACCESS, access_claims)
+        return LoginResponse(
+            refresh_token=new_refresh_token,
+            access_token=access_token
         )
+
+    async def _build_access_claims(self, uow: UnitOfWork, user: UserPrincipal) -> dict:
+        if not settings.STATELESS_AUTH:
+            return {"tv": user.token_version}
         async with uow:
-            logger.info("IN UOW 2")
-            save_token = self._build_refresh_token(existing_user.id, refresh_token, request)
-            await uow.rftoken.create(save_token)
-        return access_token
+            perm_mask = await permission_cache.get_mask(uow.session, user.role_id)
+        return build_principal_claims(user, perm_mask)
+
+    def _build_refresh_token(self, user_id: uuid.UUID, refresh_token: str, request: Request) -> RFToken:
+        token_hash = get_token_hash(refresh_token)
+        ip, user_agent = get_client_meta(request)
+        return RFToken(
+            user_id=user_id,
+            token_hash=token_hash,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRES),
+            ip_address=ip,
+            user_agent=user_agent,
+        )
+
+    async def oauth2_login(self, uow: UnitOfWork, login: LoginRequest, request: Request):
+        tokens = await self.login(uow, login, request)
+        return tokens.access_token
 
     async def verify_account(self, uow: UnitOfWork, token: VerifyToken):
-        hash_token = security.get_token_hash(token.token)
-        async with uow:
-            existing_user = await uow.users.get_user_by_token(hash_token)
-            if not existing_user:
-                raise NotFoundError(messages.Auth.INVALID_TOKEN)
+        parsed = security.parse_link_token(EmailType.VERIFY_ACCOUNT.value, token.token)
+        if not parsed:
+            raise InvalidTokenError(messages.Auth.INVALID_TOKEN)
 
-            verified = security.verify_token(existing_user.verify_token, token.token, existing_user.verify_token_expire)
-            if verified:
-                existing_user.verified = True
-                existing_user.verify_token = None
-                existing_user.verify_token_expire = None
-                await uow.users.update(existing_user)
+        user_id, nonce = parsed
+        async with uow:
+            consumed = await uow.users.consume_verify_nonce(user_id, nonce)
+        if not consumed:
+            raise InvalidTokenError(messages.Auth.INVALID_TOKEN)
 
     async def resend_email(self, uow: UnitOfWork, email_request: EmailRequest, subject: str,
                            background_tasks: BackgroundTasks):
@@ -163,29 +186,62 @@ class AuthService:
                     detail=messages.Auth.EMAIL_ALREADY_VERIFIED
                 )
 
-            token = security.generate_token()
-            token_hash = security.get_token_hash(token)
-            existing_user.verify_token = token_hash
-            existing_user.verify_token_expire = (
-                    datetime.now(timezone.utc) + timedelta(seconds=settings.VERIFY_TOKEN_EXPIRES)
-            )
-            await uow.users.update(existing_user)
+            # Hạn của link nằm trong chữ ký, nên nonce còn đó thì ký lại link mới mà không ghi DB
+            nonce = existing_user.verify_token
+            if not nonce:
+                nonce = security.generate_link_nonce()
+                existing_user.verify_token = nonce
+                existing_user.verify_token_expire = (
+                        datetime.now(timezone.utc) + timedelta(seconds=settings.VERIFY_TOKEN_EXPIRES)
+                )
+                await uow.users.update(existing_user)
 
-        subject = "Verify Your Account"
-        verification_url = f"{settings.PROJECT_URL}/email/verify?token={token}"
+        self._send_verification_email(background_tasks, existing_user.id, email_request.email, nonce)
+
+    async def forgot_password(self, uow: UnitOfWork, email_request: EmailRequest, background_tasks: BackgroundTasks):
+        nonce = security.generate_link_nonce()
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.PASSWORD_RESET_TOKEN_EXPIRES)
+        async with uow:
+            user_id = await uow.users.set_reset_nonce(email_request.email, nonce, expires_at)
+        # Không báo email có tồn tại hay không
+        if user_id is None:
+            return
+
+        token = security.create_link_token(
+            EmailType.RESET_PASSWORD.value, user_id, nonce, settings.PASSWORD_RESET_TOKEN_EXPIRES
+        )
+        subject = "Reset Your Password"
         email_context = {
             "subject": subject,
             "user_email_placeholder": email_request.email,
-            "verification_url": verification_url,
+            "reset_url": f"{settings.FRONTEND_HOST}/reset-password?token={token}",
         }
         background_tasks.add_task(
-            send_email, email_request.email, subject, EmailType.VERIFY_ACCOUNT.value, email_context
+            send_email, email_request.email, subject, EmailType.RESET_PASSWORD.value, email_context
         )
 
-    # async def forgot_password(self, request: EmailRequest):
-    #     existing_user = self.user_repo.get_user_by_email(request.email)
-    #     if not existing_user:
-    #         raise NotFoundError(messages.User.USER_NOT_FOUND)
+    async def reset_password(self, uow: UnitOfWork, reset_in: ResetPasswordRequest):
+        parsed = security.parse_link_token(EmailType.RESET_PASSWORD.value, reset_in.token)
+        if not parsed:
+            raise InvalidTokenError(messages.Auth.INVALID_TOKEN)
+
+        user_id, nonce = parsed
+        password_hash = await get_password_hash(reset_in.new_password)
+        async with uow:
+            consumed = await uow.users.consume_reset_nonce(user_id, nonce, password_hash)
+        if not consumed:
+            raise InvalidTokenError(messages.Auth.INVALID_TOKEN)
+
+    def _send_verification_email(self, background_tasks: BackgroundTasks, user_id: uuid.UUID, email: str, nonce: str):
+        subject = "Verify Your Account"
+        email_context = {
+            "subject": subject,
+            "user_email_placeholder": email,
+            "verification_url": build_verification_url(user_id, nonce),
+        }
+        background_tasks.add_task(
+            send_email, email, subject, EmailType.VERIFY_ACCOUNT.value, email_context
+        )
 
     # Optimize login
 
@@ -0,0 +1,45 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.services.unit_of_work import UnitOfWork
+from app.utils.logger import Module, get_logger
+
+logger = get_logger(Module.MAINTENANCE)
+
+
+async def maintain_refresh_token_partitions() -> None:
+    """Tạo trước partition cho các tháng sắp tới và xóa (hoặc detach) các partition đã hết hạn."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    until = now + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRES)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        if not await uow.rftoken.try_maintenance_lock():
+            return
+        created = await uow.rftoken.ensure_partitions(now, until, settings.REFRESH_TOKEN_PARTITIONS_AHEAD)
+        removed = await uow.rftoken.drop_expired_partitions(
+            now, detach_only=settings.REFRESH_TOKEN_PARTITION_DETACH_ONLY
+        )
+        purged = await uow.rftoken.purge_default_partition(now)
+
+    if created:
+        logger.info(f"Created refresh token partitions: {', '.join(created)}")
+    moved = {name: rows for name, rows in created.items() if rows}
+    if moved:
+        logger.warning(
+            f"Moved refresh tokens out of the default partition (maintenance was behind): {moved}"
+        )
+    if purged:
+        logger.info(f"Purged {purged} expired refresh token(s) from the default partition")
+    if removed:
+        logger.info(f"Removed expired refresh token partitions: {', '.join(removed)}")
+
+
+async def run_maintenance_loop() -> None:
+    while True:
+        try:
+            await maintain_refresh_token_partitions()
+        except Exception as e:
+            logger.error(f"Refresh token partition maintenance failed: {e}")
+        await asyncio.sleep(settings.MAINTENANCE_INTERVAL)
@@ -1,9 +1,9 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import selectinload, undefer
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
 from app.core.exceptions import NotFoundError, DuplicateEntryError
+from app.core.permission_cache import permission_cache
 from app.db.models import Permission
 from app.db.repositories.permission_repository import PermissionRepository
 from app.schemas.perm_schema import PermCreate, PermResponse
@@ -41,14 +41,13 @@ class PermissionService:
 
             perm = Permission(**perm_in.model_dump())
             await perm_repo.create(perm)
+        permission_cache.invalidate()
 
     async def get_perm_by_id(self, uow: UnitOfWork, perm_id: int):
-        load_options = [
-            selectinload(Permission.roles)
-        ]
-        async with uow:
+        # PermResponse không chứa roles nên không eager load
+        async with uow.read_only():
             perm_repo = uow.permissions
-            existing_perm = await perm_repo.get_by_id(perm_id, load_options=load_options)
+            existing_perm = await perm_repo.get_by_id(perm_id)
             if not existing_perm:
                 raise NotFoundError(messages.Permission.PERMISSION_NOT_FOUND)
 
@@ -3,6 +3,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
 from app.core.exceptions import NotFoundError
+from app.core.permission_cache import permission_cache
 from app.db.models import Role
 from app.db.repositories.role_repository import RoleRepository
 from app.schemas.role_schema import RoleCreate, RoleResponse
@@ -20,6 +21,7 @@ class RoleService:
 
             role = Role(**role_in.model_dump())
             await uow.roles.create(role)
+        permission_cache.invalidate()
 
         return RoleResponse.model_validate(role)
 
@@ -1,25 +1,76 @@
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core import deadlines
+from app.core.db import RequestSession
+from app.core.exceptions import DeadlineExceededError
+from app.core.replicas import Replica, replica_router
 from app.db.repositories.permission_repository import PermissionRepository
 from app.db.repositories.rftoken_repository import RFTokenRepository
 from app.db.repositories.role_repository import RoleRepository
 from app.db.repositories.user_repository import UserRepository
+from app.utils import messages
 
 
 class UnitOfWork:
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], request_session: RequestSession | None = None):
         self.session_factory = session_factory
+        self.request_session = request_session
+        self.replica: Replica | None = None
+        self._read_only = False
+        self._bound_session = None
+
+    def read_only(self) -> "UnitOfWork":
+        """
+        Block `async with` kế tiếp chỉ đọc: chạy trên replica nếu có replica khỏe
+        và request chưa ghi gì vào primary, ngược lại dùng session như bình thường.
+        """
+        self._read_only = True
+        return self
 
     async def __aenter__(self):
-        self.session = self.session_factory()
+        read_only, self._read_only = self._read_only, False
+        # statement_timeout được đặt lazily ở after_begin (app.core.deadlines); ở đây chỉ chặn sớm
+        # block mở ra khi request đã hết ngân sách
+        timeout_ms = deadlines.remaining_ms()
+        if timeout_ms is not None and timeout_ms <= 0:
+            raise DeadlineExceededError(messages.DatabaseError.TIMEOUT_ERROR)
+
+        self.replica = None
+        if read_only and not (self.request_session is not None and self.request_session.wrote):
+            self.replica = replica_router.pick()
+
+        if self.replica is not None:
+            self.session = self.replica.session_factory()
+        elif self.request_session is not None:
+            self.session = self.request_session.acquire()
+        else:
+            self.session = self.session_factory()
+
+        # Repository đã tạo ở block trước có thể giữ session khác (đã đóng hoặc của replica)
+        if self.session is not self._bound_session:
+            for attr in ('_users', '_roles', '_perms', '_rftoken'):
+                self.__dict__.pop(attr, None)
+            self._bound_session = self.session
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if exc_type:
             await self.session.rollback()
+            if (
+                self.replica is not None
+                and isinstance(exc_val, (OperationalError, InterfaceError))
+                and not deadlines.is_statement_timeout(exc_val)
+            ):
+                replica_router.mark_unhealthy(self.replica, exc_val)
         else:
             await self.session.commit()
-        await self.session.close()
+        if self.replica is None and self.request_session is not None:
+            await self.request_session.release()
+        else:
+            await self.session.close()
+        if deadlines.is_statement_timeout(exc_val) and deadlines.remaining_ms() is not None:
+            raise DeadlineExceededError(messages.DatabaseError.TIMEOUT_ERROR) from exc_val
 
     async def commit(self):
         await self.session.commit()
@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.count_cache import count_cache
+from app.schemas.response_schema import Cursor
+from app.tests.utils.user import create_random_user, login
+from app.utils.constants import DEFAULT_ROLE, P
+
+
+def test_change_user_role_revokes_existing_tokens(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-manager", perms=(P.USER_UPDATE, P.USER_READ))
+    target = create_random_user(client, role="test-user-reader", perms=(P.USER_READ,))
+    admin_headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+    target_tokens = login(client, target.email)
+    target_headers = {"Authorization": f"Bearer {target_tokens['access_token']}"}
+
+    r = client.get(f"{settings.API_V1_STR}/admin/users/{target.id}", headers=target_headers)
+    assert r.status_code == 200
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/admin/users/{target.id}/role",
+        json={"role": DEFAULT_ROLE.value},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200, r.text
+
+    r = client.get(f"{settings.API_V1_STR}/admin/users/{target.id}", headers=target_headers)
+    assert r.status_code == 403
+    r = client.post(f"{settings.API_V1_STR}/auth/refresh", json={"refresh_token": target_tokens["refresh_token"]})
+    assert r.status_code == 401
+    r = client.get(f"{settings.API_V1_STR}/admin/users/{target.id}", headers=admin_headers)
+    assert r.json()["data"]["role"] == DEFAULT_ROLE.value
+
+
+def test_change_own_role_is_rejected(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-manager", perms=(P.USER_UPDATE, P.USER_READ))
+    headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/admin/users/{admin.id}/role", json={"role": DEFAULT_ROLE.value}, headers=headers
+    )
+
+    assert r.status_code == 400
+
+
+def test_list_users_with_tampered_cursor_returns_400(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-lister", perms=(P.USER_READ_LIST,))
+    headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+    r = client.get(f"{settings.API_V1_STR}/admin/users", params={"size": 1}, headers=headers)
+    assert r.status_code == 200
+    cursor = r.json()["meta"]["next_cursor"]
+    assert cursor
+
+    r = client.get(f"{settings.API_V1_STR}/admin/users", params={"cursor": cursor, "size": 1}, headers=headers)
+    assert r.status_code == 200
+
+    tampered = Cursor(created_at=datetime.now(timezone.utc), id="not-a-uuid").encode()
+    r = client.get(f"{settings.API_V1_STR}/admin/users", params={"cursor": tampered}, headers=headers)
+    assert r.status_code == 400
+
+
+def test_bulk_delete_reports_missing_ids(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-deleter", perms=(P.USER_DELETE,))
+    target = create_random_user(client)
+    missing = uuid.uuid4()
+    headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+
+    r = client.post(
+        f"{settings.API_V1_STR}/admin/users/bulk-delete", json=[str(target.id), str(missing)], headers=headers
+    )
+
+    assert r.status_code == 200, r.text
+    assert r.json()["data"] == {"deleted": 1, "not_found": [str(missing)]}
+
+
+def test_bulk_create_with_duplicate_email_returns_409(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-creator", perms=(P.USER_CREATE_LIST,))
+    headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+    user = {"email": admin.email, "password": "User@1234", "fullname": "Bulk", "dob": "1990-01-01", "gender": "male"}
+
+    r = client.post(f"{settings.API_V1_STR}/admin/users/bulk", json=[user], headers=headers)
+
+    assert r.status_code == 409, r.text
+
+
+def test_list_users_reports_count_strategy_actually_used(client: TestClient) -> None:
+    admin = create_random_user(client, role="test-user-lister", perms=(P.USER_READ_LIST,))
+    headers = {"Authorization": f"Bearer {login(client, admin.email)['access_token']}"}
+    count_cache.invalidate("users")
+
+    def meta() -> dict:
+        r = client.get(f"{settings.API_V1_STR}/admin/users", params={"size": 1, "count": "cached"}, headers=headers)
+        assert r.status_code == 200, r.text
+        return r.json()["meta"]
+
+    assert meta()["count_strategy"] == "exact"
+    assert meta()["count_strategy"] == "cached"
@@ -0,0 +1,115 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.benchmarks.common import StatementCounter
+from app.core.config import settings
+from app.core.db import database
+from app.core.principal_cache import principal_cache
+from app.core.replicas import ReplicaRouter
+from app.services import auth_service, unit_of_work
+from app.tests.utils.user import create_random_user, ensure_role, login
+from app.tests.utils.utils import random_email
+from app.utils.constants import P
+
+REFRESH_URL = f"{settings.API_V1_STR}/auth/refresh"
+
+
+@pytest.fixture
+def reader(client: TestClient):
+    return create_random_user(client, role="test-user-reader", perms=(P.USER_READ,))
+
+
+def _get_self(client: TestClient, user, token: str):
+    return client.get(f"{settings.API_V1_STR}/admin/users/{user.id}", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_refresh_rotates_tokens(client: TestClient, reader) -> None:
+    tokens = login(client, reader.email)
+
+    r = client.post(REFRESH_URL, json={"refresh_token": tokens["refresh_token"]})
+
+    assert r.status_code == 200
+    rotated = r.json()["data"]
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert _get_self(client, reader, rotated["access_token"]).status_code == 200
+    assert client.post(REFRESH_URL, json={"refresh_token": rotated["refresh_token"]}).status_code == 200
+
+
+def test_reusing_rotated_refresh_token_revokes_family(client: TestClient, reader) -> None:
+    tokens = login(client, reader.email)
+    rotated = client.post(REFRESH_URL, json={"refresh_token": tokens["refresh_token"]}).json()["data"]
+
+    assert client.post(REFRESH_URL, json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    # Token mới nhất của cùng họ cũng bị thu hồi
+    assert client.post(REFRESH_URL, json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+
+def test_refresh_token_is_rejected_as_bearer_token(client: TestClient, reader) -> None:
+    tokens = login(client, reader.email)
+
+    assert _get_self(client, reader, tokens["access_token"]).status_code == 200
+    assert _get_self(client, reader, tokens["refresh_token"]).status_code == 403
+
+
+def test_access_token_is_rejected_by_refresh(client: TestClient, reader) -> None:
+    tokens = login(client, reader.email)
+
+    assert client.post(REFRESH_URL, json={"refresh_token": tokens["access_token"]}).status_code == 401
+
+
+def test_login_reads_credentials_from_primary(client: TestClient, reader, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Replica không kết nối được: login vẫn phải thành công vì không đọc qua replica
+    dead = ReplicaRouter([str(settings.SQLALCHEMY_DATABASE_URI).replace(f":{settings.POSTGRES_PORT}/", ":1/")], "round_robin")
+    monkeypatch.setattr(unit_of_work, "replica_router", dead)
+
+    try:
+        assert login(client, reader.email)["access_token"]
+    finally:
+        client.portal.call(dead.dispose)
+    assert "replicas" not in dead.__dict__
+
+
+def test_register_same_email_twice_returns_409(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    ensure_role(client)
+    monkeypatch.setattr(auth_service, "send_email", lambda *args: None)
+    body = {"email": random_email(), "password": "User@1234", "fullname": "Dup User", "dob": "1990-01-01", "gender": "male"}
+
+    assert client.post(f"{settings.API_V1_STR}/auth/register", json=body).status_code == 201
+    r = client.post(f"{settings.API_V1_STR}/auth/register", json=body)
+
+    assert r.status_code == 409, r.text
+    assert r.json()["error"]["details"][0]["type"] == "duplicate_entry_error"
+
+
+def _statements(counter: StatementCounter) -> list[str]:
+    # Bỏ set_config của deadline (một câu mỗi transaction, tùy REQUEST_DEADLINE_AUTH_MS), chỉ giữ câu dữ liệu
+    return [
+        " ".join(statement.split()[:3])
+        for statement in counter.statements
+        if "set_config('statement_timeout'" not in statement
+    ]
+
+
+def test_login_and_refresh_statement_counts(client: TestClient, reader) -> None:
+    counter = StatementCounter(database.engine)
+
+    with counter.measure():
+        tokens = login(client, reader.email)
+    # Đọc credentials rồi ghi refresh token, không SELECT role/quyền, không refresh() sau INSERT
+    assert _statements(counter) == ["SELECT users.id, users.email,", "INSERT INTO refresh_tokens"]
+
+    principal_cache.invalidate(reader.id)
+    with counter.measure():
+        r = client.post(REFRESH_URL, json={"refresh_token": tokens["refresh_token"]})
+    assert r.status_code == 200
+    # Một transaction: rotate (UPDATE ... RETURNING), principal, token mới
+    assert _statements(counter) == [
+        "UPDATE refresh_tokens SET", "SELECT users.id, users.email,", "INSERT INTO refresh_tokens"
+    ]
+
+    # Principal đã có trong cache (get_current_user nạp vào) thì bỏ được câu SELECT users
+    assert _get_self(client, reader, r.json()["data"]["access_token"]).status_code == 200
+    with counter.measure():
+        r = client.post(REFRESH_URL, json={"refresh_token": r.json()["data"]["refresh_token"]})
+    assert r.status_code == 200
+    assert _statements(counter) == ["UPDATE refresh_tokens SET", "INSERT INTO refresh_tokens"]
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.tests.utils.user import create_random_user, user_authentication_headers
+from app.utils.constants import P
+
+
+def test_monitoring_endpoints_require_system_monitor(client: TestClient) -> None:
+    user = create_random_user(client)
+    headers = user_authentication_headers(client=client, email=user.email)
+
+    assert client.get(f"{settings.API_V1_STR}/utils/pool-stats", headers=headers).status_code == 403
+    assert client.get(f"{settings.API_V1_STR}/utils/slow-queries", headers=headers).status_code == 403
+
+
+def test_monitoring_endpoints_with_system_monitor(client: TestClient) -> None:
+    user = create_random_user(client, role="test-monitor", perms=(P.SYSTEM_MONITOR,))
+    headers = user_authentication_headers(client=client, email=user.email)
+
+    r = client.get(f"{settings.API_V1_STR}/utils/pool-stats", headers=headers)
+    assert r.status_code == 200
+    assert "db" in r.json()["data"]
+
+    r = client.get(f"{settings.API_V1_STR}/utils/slow-queries", params={"limit": 5}, headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()["data"]) <= 5
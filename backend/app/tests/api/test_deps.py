@@ -0,0 +1,36 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core.config import settings
+from app.core.db import RequestSession
+from app.core.permission_cache import permission_cache
+from app.core.pool_metrics import pool_metrics
+from app.core.principal_cache import principal_cache
+from app.tests.utils.user import create_random_user, login
+from app.utils.constants import P
+
+
+def test_request_checks_out_a_single_connection(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    user = create_random_user(client, role="test-user-reader", perms=(P.USER_READ,))
+    headers = {"Authorization": f"Bearer {login(client, user.email)['access_token']}"}
+    sessions: list[RequestSession] = []
+
+    class RecordingRequestSession(RequestSession):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            sessions.append(self)
+
+    monkeypatch.setattr(deps, "RequestSession", RecordingRequestSession)
+    # Cache trống: get_current_user, require_permission và service đều phải đọc DB
+    principal_cache.invalidate(user.id)
+    permission_cache.invalidate()
+    checkouts_before = pool_metrics.checkouts
+
+    r = client.get(f"{settings.API_V1_STR}/admin/users/{user.id}", headers=headers)
+
+    assert r.status_code == 200, r.text
+    [request_session] = sessions
+    assert request_session.checkouts == 1
+    assert not request_session.wrote
+    assert pool_metrics.checkouts - checkouts_before == 1
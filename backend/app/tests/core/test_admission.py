@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdmissionController
+from app.core.exceptions import ServiceOverloadedError
+from app.utils.handlers import service_overloaded_error_handler
+
+pytestmark = pytest.mark.anyio
+
+
+def _controller(max_in_flight: int = 1, max_queue: int = 1, queue_timeout: float = 1.0) -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=max_in_flight, max_queue=max_queue, queue_timeout=queue_timeout, retry_after=3
+    )
+
+
+async def test_admits_up_to_max_in_flight_without_queueing() -> None:
+    controller = _controller(max_in_flight=2)
+
+    async with controller.admit(), controller.admit():
+        assert controller.admitted == 2
+
+    assert controller.queued == 0
+    assert controller.shed == 0
+
+
+async def test_queued_task_runs_when_slot_is_released() -> None:
+    controller = _controller()
+    release = asyncio.Event()
+
+    async def run(wait: bool) -> None:
+        async with controller.admit():
+            if wait:
+                await release.wait()
+
+    holder = asyncio.create_task(run(wait=True))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(run(wait=False))
+    await asyncio.sleep(0)
+    assert controller.waiting == 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert controller.admitted == 2
+    assert controller.queued == 1
+    assert controller.waiting == 0
+
+
+async def test_sheds_when_queue_is_full() -> None:
+    controller = _controller(max_queue=0)
+
+    async with controller.admit():
+        with pytest.raises(ServiceOverloadedError) as exc_info:
+            async with controller.admit():
+                pass
+
+    assert exc_info.value.retry_after == 3
+    assert controller.shed == 1
+
+
+async def test_sheds_after_queue_timeout() -> None:
+    controller = _controller(queue_timeout=0.05)
+
+    async with controller.admit():
+        with pytest.raises(ServiceOverloadedError):
+            async with controller.admit():
+                pass
+
+    assert controller.shed == 1
+    assert controller.waiting == 0
+    # Slot bị giữ đã được trả lại, lần admit sau không phải chờ
+    async with controller.admit():
+        assert controller.admitted == 2
+
+
+def test_overloaded_error_maps_to_503_with_retry_after() -> None:
+    app = FastAPI()
+    app.add_exception_handler(ServiceOverloadedError, service_overloaded_error_handler)
+
+    @app.get("/busy")
+    async def busy() -> None:
+        raise ServiceOverloadedError("busy", retry_after=3)
+
+    response = TestClient(app).get("/busy")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json()["error"]["code"] == "HTTP_503_SERVICE_UNAVAILABLE"
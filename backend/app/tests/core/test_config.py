@@ -0,0 +1,21 @@
+import pytest
+
+from app.core.config import Settings
+
+
+def test_prepare_threshold_can_be_disabled_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DB_PREPARE_THRESHOLD", "None")
+    assert Settings().DB_PREPARE_THRESHOLD is None
+
+    monkeypatch.setenv("DB_PREPARE_THRESHOLD", "10")
+    assert Settings().DB_PREPARE_THRESHOLD == 10
+
+
+def test_request_deadlines_can_be_disabled_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("REQUEST_DEADLINE_BULK_MS", "None")
+    monkeypatch.setenv("REQUEST_DEADLINE_AUTH_MS", "2500")
+
+    settings = Settings()
+
+    assert settings.REQUEST_DEADLINE_BULK_MS is None
+    assert settings.REQUEST_DEADLINE_AUTH_MS == 2500
@@ -0,0 +1,62 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.count_cache import count_cache
+from app.core.db import AsyncSessionLocal
+from app.db.models import Role
+from app.db.repositories.role_repository import RoleRepository
+from app.utils.enums import CountStrategy
+
+
+async def _create_role(commit: bool) -> tuple[int | None, int | None]:
+    """Tạo role, trả về giá trị cache ngay sau flush và sau commit/rollback."""
+    count_cache.set("roles", -1)
+    async with AsyncSessionLocal() as session:
+        await RoleRepository(session).create(Role(name=f"test-count-{uuid.uuid4().hex[:8]}"))
+        after_flush = count_cache.get("roles")
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+        return after_flush, count_cache.get("roles")
+
+
+def test_count_cache_is_invalidated_after_commit_only(client: TestClient) -> None:
+    after_flush, after_commit = client.portal.call(_create_role, True)
+
+    # Request khác đếm giữa flush và commit vẫn thấy tổng cũ; chỉ commit mới xóa cache
+    assert after_flush == -1
+    assert after_commit is None
+
+
+def test_count_cache_is_kept_after_rollback(client: TestClient) -> None:
+    assert client.portal.call(_create_role, False) == (-1, -1)
+    count_cache.invalidate("roles")
+
+
+async def _count(strategy: CountStrategy, unanalyzed: bool = False):
+    async with AsyncSessionLocal() as session:
+        if unanalyzed:
+            # Giả lập bảng chưa từng được ANALYZE; rollback ở cuối trả lại giá trị thật
+            await session.execute(text("UPDATE pg_class SET reltuples = -1 WHERE oid = 'roles'::regclass"))
+        total = await RoleRepository(session).count(strategy)
+        await session.rollback()
+        return total
+
+
+def test_count_reports_strategy_actually_used(client: TestClient) -> None:
+    count_cache.invalidate("roles")
+
+    exact = client.portal.call(_count, CountStrategy.EXACT)
+    assert exact.strategy == CountStrategy.EXACT
+    assert client.portal.call(_count, CountStrategy.NONE) == (None, CountStrategy.NONE)
+
+    # Cache trống: đếm thật rồi cache lại; lần sau mới là giá trị cached
+    assert client.portal.call(_count, CountStrategy.CACHED) == (exact.total, CountStrategy.EXACT)
+    assert client.portal.call(_count, CountStrategy.CACHED) == (exact.total, CountStrategy.CACHED)
+
+    # reltuples = -1: ước lượng không dùng được, rơi về count(*)
+    assert client.portal.call(_count, CountStrategy.ESTIMATED, True) == (exact.total, CountStrategy.EXACT)
+    count_cache.invalidate("roles")
@@ -0,0 +1,22 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api.deps import request_deadline
+from app.core import deadlines
+
+
+async def _remaining_after(*budgets: int | None) -> int | None:
+    # asyncio.run chạy trong bản sao context: deadline không rò sang test khác
+    request = SimpleNamespace(state=SimpleNamespace())
+    for budget_ms in budgets:
+        await request_deadline(budget_ms)(request)
+    return deadlines.remaining_ms()
+
+
+def test_route_deadline_overrides_router_deadline() -> None:
+    assert 59000 < asyncio.run(_remaining_after(10000, 60000)) <= 60000
+
+
+def test_disabled_route_deadline_clears_router_deadline() -> None:
+    assert asyncio.run(_remaining_after(10000, None)) is None
+    assert deadlines.remaining_ms() is None
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.core import security
+from app.core.password_pool import PasswordHashPool
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+@pytest.mark.anyio
+async def test_pool_runs_in_child_processes_and_records_stats() -> None:
+    pool = PasswordHashPool(max_workers=1)
+    pool.start()
+    try:
+        assert await pool.run(_pid) != os.getpid()
+        hashed = await pool.run(security._get_password_hash_sync, "Passw0rd!")
+        assert await pool.run(security._verify_password_sync, "Passw0rd!", hashed)
+        assert not await pool.run(security._verify_password_sync, "wrong", hashed)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["completed"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.anyio
+async def test_pool_falls_back_to_default_executor_when_not_started() -> None:
+    pool = PasswordHashPool(max_workers=1)
+
+    # Chưa start (script, CLI) hoặc đã shutdown: chạy trong thread pool của event loop
+    assert await pool.run(_pid) == os.getpid()
+    pool.start()
+    pool.shutdown()
+    assert await pool.run(_pid) == os.getpid()
+    assert pool.stats()["completed"] == 0
+
+
+@pytest.mark.anyio
+async def test_security_helpers_go_through_the_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = PasswordHashPool(max_workers=1)
+    monkeypatch.setattr(security, "password_pool", pool)
+    pool.start()
+    try:
+        hashed = await security.get_password_hash("Passw0rd!")
+        assert await security.verify_password("Passw0rd!", hashed)
+        assert await security.get_password_hash("Passw0rd!", admission=False) != hashed
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["completed"] == 3
@@ -0,0 +1,43 @@
+import pytest
+
+from app.core.permission_cache import PermissionCache
+from app.db.repositories.permission_repository import PermissionRepository
+from app.utils.constants import P
+
+pytestmark = pytest.mark.anyio
+
+
+def test_each_permission_has_a_distinct_single_bit() -> None:
+    masks = [perm.mask for perm in P]
+
+    assert all(mask and mask & (mask - 1) == 0 for mask in masks)
+    assert len(set(masks)) == len(masks)
+
+
+def test_to_mask_combines_names_and_ignores_unknown() -> None:
+    mask = P.to_mask([P.USER_READ.value, P.USER_DELETE.value, "legacy:removed"])
+
+    assert mask == P.USER_READ.mask | P.USER_DELETE.mask
+    assert not mask & P.ITEM_READ.mask
+    assert P.to_mask([]) == 0
+
+
+async def test_cache_loads_once_and_reloads_after_invalidate(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = 0
+
+    async def fake_rows(_self) -> list[tuple[int, str]]:
+        nonlocal calls
+        calls += 1
+        return [(1, P.USER_READ.value), (1, P.USER_DELETE.value), (2, P.ITEM_READ.value)]
+
+    monkeypatch.setattr(PermissionRepository, "get_role_perm_names", fake_rows)
+    cache = PermissionCache(ttl=60)
+
+    assert await cache.has_permission(None, 1, P.USER_DELETE)
+    assert not await cache.has_permission(None, 2, P.USER_DELETE)
+    assert await cache.get_mask(None, 3) == 0
+    assert calls == 1
+
+    cache.invalidate()
+    assert await cache.has_permission(None, 2, P.ITEM_READ)
+    assert calls == 2
@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.schemas.user_schema import UserPrincipal
+
+
+def _principal(token_version: int = 0) -> UserPrincipal:
+    return UserPrincipal(
+        id=uuid.uuid4(), email="user@example.com", role_id=1, verified=True, token_version=token_version
+    )
+
+
+def test_get_returns_cached_principal_until_invalidated() -> None:
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = _principal()
+    cache.set(principal)
+
+    assert cache.get(principal.id) == principal
+    cache.invalidate(principal.id)
+    assert cache.get(principal.id) is None
+
+
+def test_expired_entry_is_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = _principal()
+    cache.set(principal)
+
+    monkeypatch.setattr("app.core.principal_cache.time.monotonic", lambda: float("inf"))
+
+    assert cache.get(principal.id) is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.set(first)
+    cache.set(second)
+    cache.get(first.id)
+    cache.set(third)
+
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) == first
+    assert cache.get(third.id) == third
+
+
+def test_invalidate_after_commit_waits_for_commit() -> None:
+    principal = _principal()
+    principal_cache.set(principal)
+    session = Session()
+    session.begin()
+
+    principal_cache.invalidate_after_commit(session, principal.id)
+    assert principal_cache.get(principal.id) == principal
+
+    session.commit()
+    assert principal_cache.get(principal.id) is None
+
+
+def test_invalidate_after_commit_is_dropped_on_rollback() -> None:
+    principal = _principal()
+    session = Session()
+    session.begin()
+    principal_cache.invalidate_after_commit(session, principal.id)
+    session.rollback()
+
+    principal_cache.set(principal)
+    session.begin()
+    session.commit()
+
+    assert principal_cache.get(principal.id) == principal
+    principal_cache.invalidate(principal.id)
@@ -0,0 +1,112 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import false, text, update
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, RequestSession
+from app.core.replicas import Replica, ReplicaRouter
+from app.db.models import Role
+from app.services import unit_of_work
+from app.services.unit_of_work import UnitOfWork
+
+PRIMARY_URL = str(settings.SQLALCHEMY_DATABASE_URI)
+# Không có gì lắng nghe ở port 1: connect thất bại ngay
+DEAD_URL = PRIMARY_URL.replace(f":{settings.POSTGRES_PORT}/", ":1/")
+
+
+def test_round_robin_skips_unhealthy_replicas() -> None:
+    router = ReplicaRouter([PRIMARY_URL, PRIMARY_URL, PRIMARY_URL], "round_robin")
+    first, second, third = router.replicas
+
+    assert [router.pick() for _ in range(3)] == [first, second, third]
+
+    router.mark_unhealthy(second, OperationalError("SELECT 1", {}, Exception("down")))
+    picks = [router.pick() for _ in range(4)]
+    assert second not in picks
+    assert picks.count(first) == picks.count(third) == 2
+
+
+def test_least_conn_picks_replica_with_fewest_checkouts(monkeypatch: pytest.MonkeyPatch) -> None:
+    router = ReplicaRouter([PRIMARY_URL, PRIMARY_URL], "least_conn")
+    busy, idle = router.replicas
+    load = {busy: 3, idle: 1}
+    monkeypatch.setattr(Replica, "checked_out", lambda replica: load[replica])
+
+    assert router.pick() is idle
+    load[idle] = 5
+    assert router.pick() is busy
+
+
+def test_pick_returns_none_when_no_replica_is_healthy() -> None:
+    router = ReplicaRouter([PRIMARY_URL], "round_robin")
+    router.mark_unhealthy(router.replicas[0], Exception("down"))
+
+    assert router.pick() is None
+
+
+def test_health_check_marks_and_restores_replicas(client: TestClient) -> None:
+    router = ReplicaRouter([PRIMARY_URL, DEAD_URL], "round_robin")
+    alive, dead = router.replicas
+    alive.healthy = False
+
+    try:
+        client.portal.call(router.check_health)
+    finally:
+        client.portal.call(router.dispose)
+
+    assert alive.healthy
+    assert not dead.healthy
+
+
+async def _read(uow: UnitOfWork) -> int:
+    async with uow.read_only():
+        return (await uow.session.execute(text("SELECT 1"))).scalar_one()
+
+
+async def _write_then_read(uow: UnitOfWork) -> Replica | None:
+    async with uow:
+        await uow.session.execute(update(Role).where(false()).values(name=Role.name))
+    await _read(uow)
+    return uow.replica
+
+
+@pytest.fixture
+def router(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    router = ReplicaRouter([PRIMARY_URL], "round_robin")
+    monkeypatch.setattr(unit_of_work, "replica_router", router)
+    yield router
+    client.portal.call(router.dispose)
+
+
+def test_read_only_block_runs_on_replica(client: TestClient, router: ReplicaRouter) -> None:
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+
+    assert client.portal.call(_read, uow) == 1
+    assert uow.replica is router.replicas[0]
+
+
+def test_failing_replica_is_marked_unhealthy_and_primary_is_used(
+    client: TestClient, router: ReplicaRouter
+) -> None:
+    router.__dict__["replicas"] = [Replica(DEAD_URL)]
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+
+    with pytest.raises(OperationalError):
+        client.portal.call(_read, uow)
+    assert not router.replicas[0].healthy
+
+    assert client.portal.call(_read, uow) == 1
+    assert uow.replica is None
+
+
+@pytest.mark.usefixtures("router")
+def test_read_after_write_in_request_stays_on_primary(client: TestClient) -> None:
+    request_session = RequestSession(AsyncSessionLocal)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal, request_session=request_session)
+
+    try:
+        assert client.portal.call(_write_then_read, uow) is None
+    finally:
+        client.portal.call(request_session.close)
+    assert request_session.wrote
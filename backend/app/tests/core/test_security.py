@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from app.core import security
+from app.utils.enums import EmailType
+
+VERIFY = EmailType.VERIFY_ACCOUNT.value
+RESET = EmailType.RESET_PASSWORD.value
+
+
+def test_link_token_round_trip() -> None:
+    user_id = uuid.uuid4()
+    nonce = security.generate_link_nonce()
+
+    token = security.create_link_token(VERIFY, user_id, nonce, 600)
+
+    assert security.parse_link_token(VERIFY, token) == (user_id, nonce)
+
+
+def test_link_token_is_bound_to_its_purpose() -> None:
+    token = security.create_link_token(VERIFY, uuid.uuid4(), security.generate_link_nonce(), 600)
+
+    assert security.parse_link_token(RESET, token) is None
+
+
+def test_expired_link_token_is_rejected() -> None:
+    token = security.create_link_token(VERIFY, uuid.uuid4(), security.generate_link_nonce(), -1)
+
+    assert security.parse_link_token(VERIFY, token) is None
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    [
+        lambda token: token[:-2] + ("AA" if not token.endswith("AA") else "BB"),
+        # Đổi hạn dùng mà giữ chữ ký cũ
+        lambda token: ".".join([*token.split(".")[:2], "9999999999", token.split(".")[3]]),
+        lambda token: uuid.uuid4().hex + token[32:],
+        lambda token: token[:-1] + "é",
+        lambda token: token.replace(".", "。"),
+        lambda token: token + ".extra",
+        lambda token: "",
+    ],
+)
+def test_tampered_link_token_is_rejected(tamper) -> None:
+    token = security.create_link_token(VERIFY, uuid.uuid4(), security.generate_link_nonce(), 600)
+
+    assert security.parse_link_token(VERIFY, tamper(token)) is None
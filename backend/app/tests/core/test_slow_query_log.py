@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core import sql_metrics
+from app.core.slow_query_log import SlowQueryLog, redact_params
+
+
+def test_redact_params_never_keeps_values() -> None:
+    params = {"replaced_by": "f3a9c2", "user_id": uuid.uuid4(), "limit": 20, "ids": [1, 2, 3], "note": None}
+
+    assert redact_params(params) == {
+        "replaced_by": "str[6]",
+        "user_id": "UUID",
+        "limit": "int",
+        "ids": "list[3]",
+        "note": "None",
+    }
+
+
+def test_redact_params_positional() -> None:
+    assert redact_params(("s3cret", b"\x00\x01", 7)) == ["str[6]", "bytes[2]", "int"]
+    assert redact_params(None) is None
+
+
+def test_observe_ignores_fast_and_explain_statements() -> None:
+    log = SlowQueryLog(threshold_ms=100, size=2, explain=False, log=False)
+
+    log.observe("SELECT 1", "SELECT 1", None, 0.05, False)
+    log.observe("EXPLAIN SELECT 1", "EXPLAIN SELECT 1", None, 0.5, False)
+    assert log.recent() == []
+
+    for i in range(3):
+        log.observe(f"SELECT {i}", f"SELECT {i}", {"email": "a@b.c"}, 0.5, False)
+    entries = log.recent()
+    assert [entry["sql"] for entry in entries] == ["SELECT 2", "SELECT 1"]
+    assert entries[0]["params"] == {"email": "str[5]"}
+
+
+def test_observe_executemany_reports_row_count() -> None:
+    log = SlowQueryLog(threshold_ms=0, size=10, explain=False, log=False)
+
+    log.observe("INSERT INTO t VALUES (%s)", "INSERT INTO t VALUES (%s)", [("a",), ("b",)], 0.01, True)
+
+    assert log.recent()[0]["params"] == "<2 rows>"
+
+
+@pytest.mark.anyio
+async def test_explain_runs_outside_request_context() -> None:
+    log = SlowQueryLog(threshold_ms=0, size=10, explain=True, log=False)
+    seen = []
+
+    async def fake_explain(_entry, _statement, _parameters) -> None:
+        seen.append(sql_metrics._current.get())
+
+    log._explain = fake_explain
+    stats, token = sql_metrics.start_request()
+    try:
+        log.observe("SELECT 1", "SELECT 1", None, 0.01, False)
+        await asyncio.gather(*log._pending)
+    finally:
+        sql_metrics.end_request(token)
+
+    # Câu EXPLAIN nền không được tính vào thống kê SQL của request
+    assert seen == [None]
@@ -0,0 +1,35 @@
+from app.core import sql_metrics
+from app.core.sql_metrics import RequestSQLStats, normalize_sql
+
+
+def test_normalize_sql_collapses_whitespace() -> None:
+    assert normalize_sql("SELECT  users.id\n  FROM users\n\tWHERE users.id = %(id_1)s ") == (
+        "SELECT users.id FROM users WHERE users.id = %(id_1)s"
+    )
+
+
+def test_normalize_sql_collapses_expanded_in_lists() -> None:
+    two = "SELECT * FROM roles WHERE roles.id IN (%(id_1_1)s, %(id_1_2)s)"
+    three = "SELECT * FROM roles WHERE roles.id IN (%(id_1_1)s::UUID, %(id_1_2)s::UUID, %(id_1_3)s::UUID)"
+
+    assert normalize_sql(two) == normalize_sql(three) == "SELECT * FROM roles WHERE roles.id IN (...)"
+
+
+def test_request_stats_counts_shapes() -> None:
+    stats = RequestSQLStats()
+    for ids in ("(%(id_1_1)s)", "(%(id_1_1)s, %(id_1_2)s)", "(%(id_1_1)s)"):
+        stats.record(f"SELECT * FROM users WHERE users.role_id IN {ids}", 0.002)
+    stats.record("SELECT 1", 0.001)
+
+    assert stats.count == 4
+    assert stats.ms == 7.0
+    assert stats.repeated(2) == [("SELECT * FROM users WHERE users.role_id IN (...)", 3)]
+    assert stats.repeated(3) == []
+
+
+def test_start_and_end_request() -> None:
+    stats, token = sql_metrics.start_request()
+    assert sql_metrics._current.get() is stats
+
+    sql_metrics.end_request(token)
+    assert sql_metrics._current.get() is None
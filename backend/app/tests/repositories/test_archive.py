@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal
+from app.core.exceptions import ApplicationError
+from app.services.unit_of_work import UnitOfWork
+from app.tests.utils.user import create_random_user, ensure_role, login
+
+
+async def _archive_users(ids: list) -> list:
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        return await uow.users.archive_many(ids)
+
+
+async def _archive_roles(ids: list) -> list:
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        return await uow.roles.archive_many(ids)
+
+
+async def _fetch(sql: str, params: dict) -> list[dict]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text(sql), params)
+        return [dict(row) for row in result.mappings()]
+
+
+def test_archive_many_moves_users_and_removes_refresh_tokens(client: TestClient) -> None:
+    first = create_random_user(client)
+    second = create_random_user(client, verified=False)
+    login(client, first.email)
+    missing = uuid.uuid4()
+
+    archived = client.portal.call(_archive_users, [first.id, second.id, missing])
+
+    assert set(archived) == {first.id, second.id}
+    rows = client.portal.call(
+        _fetch,
+        "SELECT * FROM deleted_users WHERE original_id IN (:first, :second)",
+        {"first": first.id, "second": second.id},
+    )
+    by_id = {row["original_id"]: row for row in rows}
+    assert set(by_id) == {first.id, second.id}
+    for user in (first, second):
+        row = by_id[user.id]
+        assert row["email"] == user.email
+        assert row["password_hash"] == user.password_hash
+        assert row["archived_role_id"] == user.role_id
+        assert row["verified"] == user.verified
+        assert row["verify_token"] == ""
+        assert row["archived_at"] is not None
+    assert client.portal.call(_fetch, "SELECT id FROM users WHERE id = :id", {"id": first.id}) == []
+    assert client.portal.call(_fetch, "SELECT id FROM refresh_tokens WHERE user_id = :id", {"id": first.id}) == []
+
+
+def test_archive_many_with_only_missing_ids_archives_nothing(client: TestClient) -> None:
+    assert client.portal.call(_archive_users, [uuid.uuid4()]) == []
+
+
+def test_archiving_a_role_still_assigned_to_users_fails_cleanly(client: TestClient) -> None:
+    user = create_random_user(client, role="test-role-in-use")
+
+    with pytest.raises(ApplicationError) as exc_info:
+        client.portal.call(_archive_roles, [user.role_id])
+
+    assert exc_info.value.status_code == 409
+    # Cả câu bị rollback: role và user vẫn còn, không có gì trong deleted_roles
+    assert client.portal.call(_fetch, "SELECT id FROM roles WHERE id = :id", {"id": user.role_id})
+    assert client.portal.call(
+        _fetch, "SELECT id FROM deleted_roles WHERE original_id = :id", {"id": user.role_id}
+    ) == []
+
+
+def test_archiving_an_unused_role_archives_it(client: TestClient) -> None:
+    role_id = ensure_role(client, f"test-role-unused-{uuid.uuid4().hex[:8]}")
+
+    assert client.portal.call(_archive_roles, [role_id]) == [role_id]
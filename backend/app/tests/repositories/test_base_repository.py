@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+from app.core import sql_metrics
+from app.core.db import AsyncSessionLocal
+from app.db.repositories.user_repository import UserRepository
+from app.services.admin_service import USER_RESPONSE_COLUMNS
+from app.tests.utils.user import create_random_user
+
+
+async def _partial_then_full(user_id) -> tuple[str, str, int]:
+    async with AsyncSessionLocal() as session:
+        users = UserRepository(session)
+        partial = await users.get_by_id(
+            user_id, load={"role": "joined"}, columns=USER_RESPONSE_COLUMNS, raise_on_lazy=True
+        )
+        full = await users.get_by_id(user_id)
+        stats, token = sql_metrics.start_request()
+        try:
+            again = await users.get_by_id(user_id, load={"role": "joined"})
+        finally:
+            sql_metrics.end_request(token)
+        assert partial is full is again
+        return full.password_hash, again.role.name, stats.count
+
+
+def test_get_by_id_completes_partially_loaded_instance(client: TestClient) -> None:
+    user = create_random_user(client)
+
+    password_hash, role_name, statements = client.portal.call(_partial_then_full, user.id)
+
+    assert password_hash == user.password_hash
+    assert role_name
+    # Object đã đủ cột và relationship trong identity map: không tốn câu SQL nào
+    assert statements == 0
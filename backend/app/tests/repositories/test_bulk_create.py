@@ -0,0 +1,119 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.db import AsyncSessionLocal
+from app.core.exceptions import DuplicateEntryError
+from app.db.models import Role, User
+from app.db.repositories.role_repository import RoleRepository
+from app.db.repositories.user_repository import UserRepository
+from app.tests.utils.user import ensure_role
+from app.tests.utils.utils import random_email
+from app.utils.constants import Provider
+from app.utils.enums import Gender
+
+
+def _user_row(role_id: int, **values) -> dict:
+    # Chỉ các cột bắt buộc; id, created_at, token_version, verified, provider... do default điền
+    return {
+        "email": random_email(),
+        "password_hash": "hash",
+        "fullname": "Bulk User",
+        "gender": Gender.FEMALE,
+        "role_id": role_id,
+        **values,
+    }
+
+
+async def _create_users(rows: list[dict], returning: bool) -> list[User]:
+    async with AsyncSessionLocal() as session:
+        created = await UserRepository(session).create_many(rows, returning=returning)
+        await session.commit()
+        return created
+
+
+async def _users_by_email(emails: list[str]) -> dict[str, User]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(User).where(User.email.in_(emails)))
+        return {user.email: user for user in result.scalars()}
+
+
+async def _copy_roles(rows: list[dict]) -> list[tuple]:
+    async with AsyncSessionLocal() as session:
+        await RoleRepository(session).copy_many(rows)
+        result = await session.execute(
+            select(Role.id, Role.name, Role.desc).where(Role.name.in_([row["name"] for row in rows]))
+        )
+        roles = result.all()
+        await session.rollback()
+        return roles
+
+
+def test_copy_fills_defaults_and_round_trips_column_types(client: TestClient) -> None:
+    role_id = ensure_role(client)
+    expires = datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=7)))
+    rows = [
+        _user_row(role_id, dob=date(1991, 2, 3), address="1 Main St", verify_token="nonce", verify_token_expire=expires),
+        # Cột nullable: bỏ trống và None tường minh
+        _user_row(role_id, address=None, dob=None),
+    ]
+
+    assert client.portal.call(_create_users, rows, False) == []
+    # Cùng dữ liệu đi đường INSERT để so: COPY binary phải ghi ra đúng giá trị như INSERT
+    inserted = client.portal.call(_create_users, [{**rows[0], "email": random_email()}], True)[0]
+
+    users = client.portal.call(_users_by_email, [row["email"] for row in rows])
+    full, sparse = users[rows[0]["email"]], users[rows[1]["email"]]
+    for user in (full, sparse):
+        assert isinstance(user.id, uuid.UUID)
+        assert user.created_at.tzinfo is not None
+        assert user.token_version == 0
+        assert user.verified is False
+        assert user.provider == Provider.LOCAL
+        assert user.gender == Gender.FEMALE
+        assert user.role_id == role_id
+    assert full.dob == date(1991, 2, 3)
+    assert full.address == "1 Main St"
+    assert full.verify_token == "nonce"
+    # Cột timestamp không timezone: giá trị có tz được đổi sang timezone của session như INSERT
+    assert full.verify_token_expire == inserted.verify_token_expire
+    assert full.verify_token_expire.tzinfo is None
+    assert sparse.dob is None
+    assert sparse.address is None
+    assert sparse.verify_token is None
+    assert sparse.verify_token_expire is None
+
+
+def test_copy_leaves_server_generated_identity_to_the_database(client: TestClient) -> None:
+    names = [f"test-copy-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+
+    roles = client.portal.call(_copy_roles, [{"name": name} for name in names])
+
+    assert sorted(role.name for role in roles) == sorted(names)
+    assert all(role.id >= 10000 for role in roles)
+    assert all(role.desc is None for role in roles)
+
+
+def test_create_many_with_returning_returns_instances(client: TestClient) -> None:
+    role_id = ensure_role(client)
+    rows = [_user_row(role_id) for _ in range(3)]
+
+    created = client.portal.call(_create_users, rows, True)
+
+    assert [user.email for user in created] == [row["email"] for row in rows]
+    assert all(user.id and user.created_at for user in created)
+
+
+@pytest.mark.parametrize("returning", [False, True])
+def test_duplicate_email_in_batch_raises_duplicate_entry(client: TestClient, returning: bool) -> None:
+    role_id = ensure_role(client)
+    email = random_email()
+    rows = [_user_row(role_id, email=email), _user_row(role_id), _user_row(role_id, email=email)]
+
+    with pytest.raises(DuplicateEntryError):
+        client.portal.call(_create_users, rows, returning)
+
+    assert client.portal.call(_users_by_email, [email]) == {}
@@ -0,0 +1,63 @@
+import uuid
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.benchmarks.common import StatementCounter
+from app.core.db import AsyncSessionLocal, database
+from app.db.models import Role, User
+from app.db.repositories.role_repository import RoleRepository
+from app.db.repositories.user_repository import UserRepository
+from app.tests.utils.user import ensure_role
+from app.tests.utils.utils import random_email
+from app.utils.enums import Gender
+
+
+async def _create_and_update(role_id: int) -> tuple[list[str], dict]:
+    counter = StatementCounter(database.engine)
+    async with AsyncSessionLocal() as session:
+        with counter.measure():
+            role = await RoleRepository(session).create(Role(name=f"test-eager-{uuid.uuid4().hex[:8]}"))
+            user = await UserRepository(session).create(
+                User(
+                    email=random_email(),
+                    password_hash="hash",
+                    fullname="Eager User",
+                    dob=date(1990, 1, 1),
+                    gender=Gender.MALE,
+                    role_id=role_id,
+                    verify_token="nonce",
+                )
+            )
+            # Đọc các giá trị do DB/default sinh ra: không được kéo theo SELECT nào
+            created = {
+                "role_id": role.id,
+                "role_created_at": role.created_at,
+                "user_id": user.id,
+                "user_created_at": user.created_at,
+                "verify_token": user.verify_token,
+                "token_version": user.token_version,
+            }
+            before_update = user.updated_at
+            user.fullname = "Renamed"
+            await UserRepository(session).update(user)
+            created["updated_at_changed"] = user.updated_at != before_update
+        statements = [statement.split()[0] for statement in counter.statements]
+        await session.rollback()
+    return statements, created
+
+
+def test_create_and_update_fill_server_values_without_select(client: TestClient) -> None:
+    role_id = ensure_role(client)
+
+    statements, created = client.portal.call(_create_and_update, role_id)
+
+    # INSERT ... RETURNING cho mỗi create, UPDATE ... RETURNING updated_at; không có refresh()
+    assert statements == ["INSERT", "INSERT", "UPDATE"]
+    assert created["role_id"] >= 10000
+    assert isinstance(created["user_id"], uuid.UUID)
+    assert created["role_created_at"] is not None
+    assert created["user_created_at"] is not None
+    assert created["verify_token"] == "nonce"
+    assert created["token_version"] == 0
+    assert created["updated_at_changed"]
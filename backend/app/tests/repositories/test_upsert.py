@@ -0,0 +1,97 @@
+import uuid
+from collections import Counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, text, update
+
+from app.core.db import AsyncSessionLocal
+from app.core.permission_catalog import sync_permission_catalog
+from app.db.models import Permission
+from app.db.repositories.permission_repository import PermissionRepository
+from app.utils.constants import P
+from app.utils.enums import UpsertOutcome
+
+INSERTED, UPDATED, SKIPPED = UpsertOutcome.INSERTED, UpsertOutcome.UPDATED, UpsertOutcome.SKIPPED
+
+
+async def _upsert(rows: list[dict], update_cols: list[str] | None) -> list[UpsertOutcome]:
+    async with AsyncSessionLocal() as session:
+        outcomes = await PermissionRepository(session).upsert_many(rows, conflict_cols=["name"], update_cols=update_cols)
+        await session.commit()
+        return outcomes
+
+
+async def _versions(names: list[str]) -> dict[str, tuple[str, str]]:
+    # xmin đổi mỗi khi dòng có phiên bản mới, tức là mỗi lần UPDATE thật sự chạy
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT name, module, xmin::text FROM permissions WHERE name = ANY(:names)"), {"names": names}
+        )
+        return {name: (module, xmin) for name, module, xmin in result}
+
+
+async def _cleanup(prefix: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Permission).where(Permission.name.startswith(prefix)))
+        await session.commit()
+
+
+def test_upsert_many_reports_inserted_updated_and_skipped(client: TestClient) -> None:
+    prefix = f"test-upsert-{uuid.uuid4().hex[:8]}"
+    a, b, c = f"{prefix}:a", f"{prefix}:b", f"{prefix}:c"
+    try:
+        first = client.portal.call(
+            _upsert, [{"name": a, "module": "m1"}, {"name": b, "module": "m1"}], ["module"]
+        )
+        assert first == [INSERTED, INSERTED]
+        before = client.portal.call(_versions, [a, b])
+
+        second = client.portal.call(
+            _upsert,
+            [
+                {"name": a, "module": "stale"},
+                {"name": a, "module": "m2"},
+                {"name": b, "module": "m1"},
+                {"name": c, "module": "m1"},
+            ],
+            ["module"],
+        )
+
+        # Dòng trùng khóa trong cùng lần gọi: dòng sau thắng
+        assert second == [SKIPPED, UPDATED, SKIPPED, INSERTED]
+        after = client.portal.call(_versions, [a, b, c])
+        assert after[a][0] == "m2"
+        # Giá trị không đổi: guard IS DISTINCT FROM bỏ qua, dòng không có phiên bản mới
+        assert after[b] == before[b]
+    finally:
+        client.portal.call(_cleanup, prefix)
+
+
+def test_upsert_many_without_update_cols_does_nothing_on_conflict(client: TestClient) -> None:
+    prefix = f"test-upsert-{uuid.uuid4().hex[:8]}"
+    name = f"{prefix}:a"
+    try:
+        assert client.portal.call(_upsert, [{"name": name, "module": "m1"}], None) == [INSERTED]
+        assert client.portal.call(_upsert, [{"name": name, "module": "m2"}], None) == [SKIPPED]
+        assert client.portal.call(_versions, [name])[name][0] == "m1"
+    finally:
+        client.portal.call(_cleanup, prefix)
+
+
+async def _sync_twice_after_drift() -> tuple[Counter, Counter]:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Permission).where(Permission.name == P.USER_READ.value).values(module="drifted")
+        )
+        first = await sync_permission_catalog(session)
+        second = await sync_permission_catalog(session)
+        await session.rollback()
+    return first, second
+
+
+def test_permission_catalog_sync_repairs_drift_then_is_a_no_op(client: TestClient) -> None:
+    first, second = client.portal.call(_sync_twice_after_drift)
+
+    assert first[UPDATED] == 1
+    assert first[INSERTED] == 0
+    assert second == Counter({SKIPPED: len(P)})
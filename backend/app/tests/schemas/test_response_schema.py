@@ -0,0 +1,46 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.exceptions import ApplicationError
+from app.schemas.response_schema import Cursor
+
+
+def _raw(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip() -> None:
+    cursor = Cursor(created_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), id=str(uuid.uuid4()), backward=True)
+
+    decoded = Cursor.decode(cursor.encode(), id_type=uuid.UUID)
+
+    assert decoded == cursor
+
+
+def test_cursor_id_is_normalized_to_primary_key_type() -> None:
+    user_id = uuid.uuid4()
+    value = _raw({"created_at": "2026-01-02T03:04:05Z", "id": user_id.hex})
+
+    assert Cursor.decode(value, id_type=uuid.UUID).id == str(user_id)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        _raw({"created_at": "2026-01-02T03:04:05Z", "id": "not-a-uuid"}),
+        _raw({"created_at": "2026-01-02T03:04:05Z", "id": "1; DROP TABLE users"}),
+        _raw({"created_at": "not-a-date", "id": str(uuid.uuid4())}),
+        _raw({"id": str(uuid.uuid4())}),
+        _raw(["2026-01-02T03:04:05Z"]),
+        base64.urlsafe_b64encode(b"\xff\xfe{").decode(),
+        "%%%not-base64%%%",
+        "",
+    ],
+)
+def test_tampered_cursor_is_rejected(value: str) -> None:
+    with pytest.raises(ApplicationError):
+        Cursor.decode(value, id_type=uuid.UUID)
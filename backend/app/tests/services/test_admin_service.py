@@ -0,0 +1,51 @@
+import pytest
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+
+from app.core.db import AsyncSessionLocal, RequestSession, database
+from app.schemas.admin_schema import AdminUserCreate
+from app.services import admin_service as admin_service_module
+from app.services.admin_service import AdminService
+from app.services.unit_of_work import UnitOfWork
+from app.tests.utils.user import ensure_role
+from app.tests.utils.utils import random_email
+from app.utils.constants import DEFAULT_ROLE
+
+
+def _user_in() -> AdminUserCreate:
+    return AdminUserCreate(
+        email=random_email(), password="User@1234", fullname="Admin Made", dob="1990-01-01", gender="male",
+        role=DEFAULT_ROLE.value,
+    )
+
+
+async def _create(many: bool) -> None:
+    request_session = RequestSession(AsyncSessionLocal)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal, request_session=request_session)
+    service = AdminService()
+    try:
+        if many:
+            await service.create_many_user(uow, [_user_in(), _user_in()], BackgroundTasks())
+        else:
+            await service.create_user(uow, _user_in(), BackgroundTasks())
+    finally:
+        await request_session.close()
+
+
+@pytest.mark.parametrize("many", [False, True])
+def test_admin_create_hashes_before_opening_unit_of_work(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, many: bool
+) -> None:
+    ensure_role(client)
+    checked_out = []
+
+    async def fake_hash(password: str, **_kwargs: object) -> str:
+        # Số connection đang bị giữ trong lúc "bcrypt" chạy
+        checked_out.append(database.engine.pool.checkedout())
+        return f"hash:{password}"
+
+    monkeypatch.setattr(admin_service_module, "get_password_hash", fake_hash)
+
+    client.portal.call(_create, many)
+
+    assert checked_out == ([0, 0] if many else [0])
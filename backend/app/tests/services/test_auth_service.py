@@ -0,0 +1,42 @@
+import pytest
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.db import AsyncSessionLocal, RequestSession
+from app.core.exceptions import DuplicateEntryError
+from app.db.models import User
+from app.schemas.auth_schema import RegisterRequest
+from app.services.auth_service import AuthService
+from app.services.unit_of_work import UnitOfWork
+from app.tests.utils.user import DEFAULT_PASSWORD, ensure_role
+from app.tests.utils.utils import random_email
+
+
+def _register_request(email: str) -> RegisterRequest:
+    return RegisterRequest(email=email, password=DEFAULT_PASSWORD, fullname="Dup User", dob="1990-01-01", gender="male")
+
+
+async def _register_twice_then_other(email: str, other: str) -> int:
+    request_session = RequestSession(AsyncSessionLocal)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal, request_session=request_session)
+    service = AuthService()
+    try:
+        await service.register(uow, _register_request(email), BackgroundTasks())
+        with pytest.raises(DuplicateEntryError):
+            await service.register(uow, _register_request(email), BackgroundTasks())
+        # Session dùng chung của request đã rollback, vẫn dùng tiếp được
+        await service.register(uow, _register_request(other), BackgroundTasks())
+        async with uow:
+            result = await uow.session.execute(
+                select(func.count()).select_from(User).where(User.email.in_([email, other]))
+            )
+            return result.scalar_one()
+    finally:
+        await request_session.close()
+
+
+def test_duplicate_register_keeps_request_session_usable(client: TestClient) -> None:
+    ensure_role(client)
+
+    assert client.portal.call(_register_twice_then_other, random_email(), random_email()) == 2
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal
+from app.db.repositories.rftoken_repository import DEFAULT_PARTITION
+from app.services.unit_of_work import UnitOfWork
+from app.tests.utils.user import create_random_user
+
+# Tháng xa trong tương lai: chưa có partition nên dòng rơi vào DEFAULT
+FUTURE_MONTH = datetime(2031, 5, 1)
+FUTURE_PARTITION = "refresh_tokens_p203105"
+
+
+async def _insert_token(user_id, token_hash: str, expires_at: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text(
+                "INSERT INTO refresh_tokens (user_id, token_hash, expires_at, is_used) "
+                "VALUES (:user_id, :token_hash, :expires_at, false)"
+            ),
+            {"user_id": user_id, "token_hash": token_hash, "expires_at": expires_at},
+        )
+        await session.commit()
+
+
+async def _count(table: str, token_hash: str) -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text(f"SELECT count(*) FROM {table} WHERE token_hash = :token_hash"), {"token_hash": token_hash}
+        )
+        return result.scalar_one()
+
+
+async def _ensure_future_partition() -> dict[str, int]:
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        return await uow.rftoken.ensure_partitions(FUTURE_MONTH, FUTURE_MONTH)
+
+
+async def _purge_default(now: datetime) -> int:
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        return await uow.rftoken.purge_default_partition(now)
+
+
+async def _drop_future_partition() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(f"DROP TABLE IF EXISTS {FUTURE_PARTITION}"))
+        await session.commit()
+
+
+def test_new_partition_takes_over_rows_from_default(client: TestClient) -> None:
+    user = create_random_user(client)
+    token_hash = f"future-{user.id}"
+    client.portal.call(_drop_future_partition)
+    try:
+        client.portal.call(_insert_token, user.id, token_hash, "2031-05-03")
+        assert client.portal.call(_count, DEFAULT_PARTITION, token_hash) == 1
+
+        created = client.portal.call(_ensure_future_partition)
+
+        assert created == {FUTURE_PARTITION: 1}
+        assert client.portal.call(_count, DEFAULT_PARTITION, token_hash) == 0
+        assert client.portal.call(_count, FUTURE_PARTITION, token_hash) == 1
+        assert client.portal.call(_count, "refresh_tokens", token_hash) == 1
+    finally:
+        client.portal.call(_drop_future_partition)
+
+
+def test_expired_rows_are_purged_from_default(client: TestClient) -> None:
+    user = create_random_user(client)
+    token_hash = f"expired-{user.id}"
+    client.portal.call(_insert_token, user.id, token_hash, "2001-05-03")
+
+    assert client.portal.call(_purge_default, datetime(2026, 10, 17)) >= 1
+    assert client.portal.call(_count, "refresh_tokens", token_hash) == 0
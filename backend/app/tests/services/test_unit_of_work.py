@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core import deadlines, sql_metrics
+from app.core.db import AsyncSessionLocal
+from app.core.exceptions import DeadlineExceededError
+from app.services.unit_of_work import UnitOfWork
+
+
+async def _block_without_sql() -> int:
+    deadlines.set_deadline(time.monotonic(), 5000)
+    stats, token = sql_metrics.start_request()
+    try:
+        async with UnitOfWork(session_factory=AsyncSessionLocal):
+            pass
+    finally:
+        sql_metrics.end_request(token)
+    return stats.count
+
+
+async def _statement_timeout(budget_ms: int | None) -> str:
+    if budget_ms is not None:
+        deadlines.set_deadline(time.monotonic(), budget_ms)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        return (await uow.session.execute(text("SHOW statement_timeout"))).scalar_one()
+
+
+async def _slow_query() -> None:
+    deadlines.set_deadline(time.monotonic(), 200)
+    uow = UnitOfWork(session_factory=AsyncSessionLocal)
+    async with uow:
+        await uow.session.execute(text("SELECT pg_sleep(1)"))
+
+
+async def _spent_budget() -> None:
+    deadlines.set_deadline(time.monotonic() - 1, 500)
+    async with UnitOfWork(session_factory=AsyncSessionLocal):
+        pass
+
+
+def test_block_without_sql_issues_no_statement(client: TestClient) -> None:
+    assert client.portal.call(_block_without_sql) == 0
+
+
+def test_statement_timeout_follows_remaining_budget(client: TestClient) -> None:
+    timeout = client.portal.call(_statement_timeout, 3000)
+    assert timeout.endswith("ms")
+    assert 2000 < int(timeout[:-2]) <= 3000
+
+    # Không có deadline: giữ timeout mặc định của server
+    assert client.portal.call(_statement_timeout, None) == "0"
+
+
+def test_statement_over_budget_raises_deadline_exceeded(client: TestClient) -> None:
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        client.portal.call(_slow_query)
+    assert time.monotonic() - started < 0.9
+
+
+def test_spent_budget_fails_before_touching_db(client: TestClient) -> None:
+    with pytest.raises(DeadlineExceededError):
+        client.portal.call(_spent_budget)
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Ngân sách thời gian import app.main (giây); CI chậm có thể nới qua biến môi trường
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "2.0"))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+from app.core.db import database
+from app.core.replicas import replica_router
+print(json.dumps({
+    "elapsed": elapsed,
+    "engine_built": database._engine is not None,
+    "replica_engines_built": "replicas" in replica_router.__dict__,
+    "modules": [name for name in ("psycopg", "fastapi_mail", "sentry_sdk") if name in sys.modules],
+}))
+"""
+
+
+def _probe_import() -> dict:
+    # Process mới để không bị ảnh hưởng bởi module đã import trong process pytest
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_build_engines_or_clients() -> None:
+    probe = _probe_import()
+
+    assert not probe["engine_built"], "The database engine should be built lazily, not at import time."
+    assert not probe["replica_engines_built"], "Replica engines should be built lazily, not at import time."
+    assert probe["modules"] == [], f"Importing app.main should not import {probe['modules']}."
+
+
+def test_import_time_within_budget() -> None:
+    # Lấy lần nhanh nhất trong vài lần chạy để giảm nhiễu
+    elapsed = min(_probe_import()["elapsed"] for _ in range(3))
+
+    assert elapsed < IMPORT_TIME_BUDGET, (
+        f"import app.main took {elapsed:.2f}s, budget is {IMPORT_TIME_BUDGET:.2f}s."
+    )
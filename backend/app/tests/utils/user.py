@@ -1,49 +1,77 @@
+from datetime import date
+
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
-from app import crud
 from app.core.config import settings
-from app.db.models import User, UserCreate, UserUpdate
-from app.tests.utils.utils import random_email, random_lower_string
-
-
-def user_authentication_headers(
-    *, client: TestClient, email: str, password: str
-) -> dict[str, str]:
-    data = {"username": email, "password": password}
-
-    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=data)
-    response = r.json()
-    auth_token = response["access_token"]
-    headers = {"Authorization": f"Bearer {auth_token}"}
-    return headers
-
-
-def create_random_user(db: Session) -> User:
-    email = random_email()
-    password = random_lower_string()
-    user_in = UserCreate(email=email, password=password)
-    user = crud.create_user(session=db, user_create=user_in)
-    return user
-
-
-def authentication_token_from_email(
-    *, client: TestClient, email: str, db: Session
-) -> dict[str, str]:
-    """
-    Return a valid token for the user with given email.
-
-    If the user doesn't exist it is created first.
-    """
-    password = random_lower_string()
-    user = crud.get_user_by_email(session=db, email=email)
-    if not user:
-        user_in_create = UserCreate(email=email, password=password)
-        user = crud.create_user(session=db, user_create=user_in_create)
-    else:
-        user_in_update = UserUpdate(password=password)
-        if not user.id:
-            raise Exception("User id not set")
-        user = crud.update_user(session=db, db_user=user, user_in=user_in_update)
-
-    return user_authentication_headers(client=client, email=email, password=password)
+from app.core.db import AsyncSessionLocal
+from app.core.permission_cache import permission_cache
+from app.core.security import _get_password_hash_sync
+from app.db.models import Permission, Role, RolePermission, User
+from app.tests.utils.utils import random_email
+from app.utils.constants import DEFAULT_ROLE, P
+from app.utils.enums import Gender
+
+DEFAULT_PASSWORD = "Passw0rd!"
+
+
+async def _ensure_role(name: str, perms: tuple[P, ...]) -> int:
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(Role).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+        role_id = (await session.execute(select(Role.id).where(Role.name == name))).scalar_one()
+        if perms:
+            await session.execute(
+                insert(RolePermission)
+                .from_select(
+                    ["role_id", "permission_id"],
+                    select(role_id, Permission.id).where(Permission.name.in_([perm.value for perm in perms])),
+                )
+                .on_conflict_do_nothing()
+            )
+        await session.commit()
+    permission_cache.invalidate()
+    return role_id
+
+
+async def _insert_user(email: str, password: str, role_id: int, verified: bool) -> User:
+    async with AsyncSessionLocal() as session:
+        user = User(
+            email=email,
+            password_hash=_get_password_hash_sync(password),
+            fullname="Test User",
+            dob=date(1990, 1, 1),
+            gender=Gender.MALE,
+            verified=verified,
+            role_id=role_id,
+        )
+        session.add(user)
+        await session.commit()
+        return user
+
+
+def ensure_role(client: TestClient, name: str = DEFAULT_ROLE.value, perms: tuple[P, ...] = ()) -> int:
+    # Chạy trên event loop của app (portal của TestClient) để dùng chung pool connection
+    return client.portal.call(_ensure_role, name, perms)
+
+
+def create_random_user(
+    client: TestClient,
+    *,
+    role: str = DEFAULT_ROLE.value,
+    perms: tuple[P, ...] = (),
+    password: str = DEFAULT_PASSWORD,
+    verified: bool = True,
+) -> User:
+    role_id = ensure_role(client, role, perms)
+    return client.portal.call(_insert_user, random_email(), password, role_id, verified)
+
+
+def login(client: TestClient, email: str, password: str = DEFAULT_PASSWORD) -> dict:
+    r = client.post(f"{settings.API_V1_STR}/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["data"]
+
+
+def user_authentication_headers(*, client: TestClient, email: str, password: str = DEFAULT_PASSWORD) -> dict[str, str]:
+    return {"Authorization": f"Bearer {login(client, email, password)['access_token']}"}
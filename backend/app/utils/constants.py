@@ -35,7 +35,28 @@ class P(str, Enum):
     ROLES_MANAGE = "roles:manage"  # Quản lý roles (tạo, sửa, xóa)
     PERMISSIONS_ASSIGN = "permissions:assign"  # Gán quyền cho roles
 
+    # === System ===
+    SYSTEM_MONITOR = "system:monitor"  # Xem số liệu vận hành (pool, hàng đợi bcrypt)
+
     @classmethod
     def all(cls) -> list[str]:
         """Trả về một list chứa tất cả các giá trị chuỗi của quyền."""
         return [item.value for item in cls]
+
+    @property
+    def mask(self) -> int:
+        """Bit của quyền trong bitmask, theo thứ tự khai báo trong enum."""
+        return _P_MASKS[self]
+
+    @classmethod
+    def to_mask(cls, names) -> int:
+        """Gộp danh sách tên quyền thành bitmask, bỏ qua các tên không có trong enum."""
+        mask = 0
+        for name in names:
+            if name in cls._value2member_map_:
+                mask |= cls(name).mask
+        return mask
+
+
+# Chỉ thêm quyền mới vào cuối enum để vị trí bit của các quyền cũ không đổi.
+_P_MASKS = {perm: 1 << index for index, perm in enumerate(P)}
@@ -1,10 +1,7 @@
-import asyncio
 import functools
 from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from pydantic import EmailStr
-from app.core.config import settings
 
 from app.core.config import settings
 from app.utils.enums import EmailType
@@ -12,21 +9,26 @@ from app.utils.enums import EmailType
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATE_DIR = BASE_DIR / "email-templates"
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=str(TEMPLATE_DIR)
-)
 
-fm = FastMail(conf)
+@functools.cache
+def get_mail_client():
+    # fastapi_mail (jinja2, aiosmtplib) chỉ được import và cấu hình khi gửi mail lần đầu
+    from fastapi_mail import ConnectionConfig, FastMail
+
+    conf = ConnectionConfig(
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+        MAIL_STARTTLS=settings.MAIL_STARTTLS,
+        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+        USE_CREDENTIALS=settings.USE_CREDENTIALS,
+        VALIDATE_CERTS=settings.VALIDATE_CERTS,
+        TEMPLATE_FOLDER=str(TEMPLATE_DIR)
+    )
+    return FastMail(conf)
 
 
 async def send_email(
@@ -35,6 +37,8 @@ async def send_email(
         template_name: EmailType,
         context: dict
 ):
+    from fastapi_mail import MessageSchema, MessageType
+
     message = MessageSchema(
         subject=subject,
         recipients=[recipient_email],
@@ -42,7 +46,7 @@ async def send_email(
         subtype=MessageType.html
     )
     try:
-        await fm.send_message(message, template_name=f"{template_name}.html")
+        await get_mail_client().send_message(message, template_name=f"{template_name}.html")
     except Exception as e:
         print(f"Error sending email: {e}")
 
@@ -41,3 +41,22 @@ class Module(str, Enum):
 
     # Exception
     EXCEPTION = "EXCEPTION"
+
+
+class TokenType(str, Enum):
+    # Claim "typ" của JWT: access token không dùng để refresh và ngược lại
+    ACCESS = "access"
+    REFRESH = "refresh"
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"  # count(*) mỗi request
+    ESTIMATED = "estimated"  # pg_class.reltuples, gần đúng
+    CACHED = "cached"  # count(*) cache theo TTL, xóa khi insert/delete
+    NONE = "none"  # không đếm
+
+
+class UpsertOutcome(str, Enum):
+    INSERTED = "inserted"
+    UPDATED = "updated"
+    SKIPPED = "skipped"  # trùng khóa mà DO NOTHING, hoặc dữ liệu không đổi
@@ -11,8 +11,10 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 # Import các exception và schema của bạn
 from app.core.exceptions import (
     ApplicationError,
+    DeadlineExceededError,
     DuplicateEntryError,
     NotFoundError,
+    ServiceOverloadedError,
 )
 from app.schemas.response_schema import ErrorDetail, ErrorResponse, ModelResponse
 from app.utils import messages
@@ -82,6 +84,43 @@ async def application_error_handler(
     )
 
 
+async def service_overloaded_error_handler(
+    _request: Request, exc: ServiceOverloadedError
+) -> JSONResponse:
+    """Xử lý lỗi quá tải (admission control), trả về 503 kèm Retry-After."""
+    response = _create_error_json_response(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        code="HTTP_503_SERVICE_UNAVAILABLE",
+        message=exc.message,
+        details=[
+            ErrorDetail(
+                msg=exc.message,
+                type="service_overloaded_error",
+            )
+        ]
+    )
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+async def deadline_exceeded_error_handler(
+    request: Request, exc: DeadlineExceededError
+) -> JSONResponse:
+    """Xử lý lỗi request hết deadline (statement_timeout của Postgres), trả về 504."""
+    logger.warning(f"Deadline exceeded on request {request.url.path}: {exc.__cause__ or exc.message}")
+    return _create_error_json_response(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        code="HTTP_504_GATEWAY_TIMEOUT",
+        message=exc.message,
+        details=[
+            ErrorDetail(
+                msg=exc.message,
+                type="deadline_exceeded_error",
+            )
+        ]
+    )
+
+
 # --- HANDLER CHO CÁC LỖI CƠ SỞ DỮ LIỆU (DATABASE ERRORS) ---
 
 async def integrity_error_handler(
@@ -169,4 +208,4 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
         code="HTTP_500_INTERNAL_SERVER_ERROR",
         message="Đã xảy ra lỗi hệ thống không mong muốn. Vui lòng liên hệ quản trị viên.",
         details=None
-    )
\ No newline at end of file
+    )
@@ -30,6 +30,12 @@ class Module(Enum):
     ROLE_SERVICE = "ROLE SERVICE"
     ROLE_ROUTER = "ROLE ROUTER"
 
+    # Maintenance
+    MAINTENANCE = "MAINTENANCE"
+
+    # Database
+    DATABASE = "DATABASE"
+
 
 class UvicornLikeFormatter(logging.Formatter):
     LEVEL_COLOR = {
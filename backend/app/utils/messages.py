@@ -10,6 +10,7 @@ FORBIDDEN_ACCESS = "You do not have permission to access this resource."
 VALIDATION_ERROR = "Input validation failed. Please check the errors."
 RATE_LIMIT_EXCEEDED = "Too many requests. Please try again later."
 SERVICE_UNAVAILABLE = "The service is temporarily unavailable. Please try again later."
+INVALID_CURSOR = "Invalid pagination cursor."
 
 
 # --- Authentication (Auth) Module Messages ---
@@ -27,6 +28,7 @@ class Auth:
     PASSWORD_RESET_SUCCESS = "Your password has been successfully reset. You can now log in with your new password."
     INVALID_TOKEN = "Invalid or expired token. Please request a new one."
     TOKEN_REFRESH_SUCCESS = "Access token refreshed successfully."
+    REFRESH_TOKEN_INVALID = "Invalid, expired or already used refresh token. Please log in again."
     TOKEN_REQUIRED = "Authentication token is required."
     TOKEN_EXPIRED = "Authentication token has expired. Please log in again."
     TOKEN_INVALID_SIGNATURE = "Invalid token signature."
@@ -55,6 +57,7 @@ class User:
     PASSWORD_CHANGE_SUCCESS = "Password changed successfully."
     CURRENT_PASSWORD_INVALID = "The current password you entered is incorrect."
     CANNOT_DELETE_SELF = "You cannot delete your own account through this action."
+    CANNOT_CHANGE_OWN_ROLE = "You cannot change your own role."
     PROFILE_PICTURE_UPDATED = "Profile picture updated successfully."
     PROFILE_PICTURE_REMOVED = "Profile picture removed successfully."
 
@@ -69,6 +72,7 @@ class Role:
     ROLE_NOT_FOUND = "Role not found."
     ROLE_ALREADY_EXISTS = "A role with the name '{role_name}' already exists."
     ROLE_IN_USE = "Cannot delete role '{role_name}' as it is currently assigned to one or more users."
+    ROLES_IN_USE = "Cannot delete roles that are currently assigned to one or more users."
     PERMISSION_ASSIGNED_SUCCESS = "Permission '{permission_name}' assigned to role '{role_name}'."
     PERMISSION_REMOVED_SUCCESS = "Permission '{permission_name}' removed from role '{role_name}'."
     PERMISSION_NOT_FOUND = "Permission not found."
@@ -109,6 +113,8 @@ class Admin:
     SYSTEM_HEALTH_OK = "System health check passed. All services are operational."
     SYSTEM_HEALTH_WARNING = "System health check has warnings. Please review."
     SYSTEM_HEALTH_CRITICAL = "System health check critical. Immediate attention required."
+    SYSTEM_STATS_FETCHED = "System statistics retrieved successfully."
+    SLOW_QUERIES_FETCHED = "Slow queries retrieved successfully."
 
 
 class DatabaseError:
@@ -9,21 +9,24 @@ from jwt import InvalidTokenError, ExpiredSignatureError, DecodeError
 
 from app.core import security
 from app.core.config import settings
-from app.utils.enums import Module
+from app.utils.enums import EmailType, Module, TokenType
 from app.utils.logger import get_logger
 from fastapi import Request
 
 logger = get_logger(Module.TOKEN_UTIL)
 
 
-def _generate_jwt_token_sync(user_id: uuid.UUID, expires_in: int) -> str:
+def _generate_jwt_token_sync(user_id: uuid.UUID, expires_in: int, token_type: TokenType, claims: dict | None = None) -> str:
     delta = timedelta(seconds=expires_in)
     now = datetime.now(timezone.utc)
     expires = now + delta
 
     payload = {
+        **(claims or {}),
         "exp": expires,  # pyjwt khuyến nghị dùng trực tiếp datetime object
         "iat": now,
+        "jti": uuid.uuid4().hex,  # token cấp trong cùng một giây vẫn khác nhau (token_hash là unique)
+        "typ": token_type.value,
         "sub": str(user_id)
     }
     return jwt.encode(
@@ -53,19 +56,33 @@ def _verify_jwt_token_sync(token: str, private_key: str, leeway_seconds: int = 0
         return None
 
 
+def _decode_jwt_token_sync(token: str, token_type: TokenType) -> dict | None:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    except InvalidTokenError:
+        logger.error("Invalid token")
+        return None
+    if payload.get("typ") != token_type.value:
+        logger.error(f"Token type mismatch, expected {token_type.value}")
+        return None
+    return payload
+
+
 def _generate_token_sync(length: int = 8) -> str:
     characters = string.ascii_letters + string.digits
     return ''.join(secrets.choice(characters) for _ in range(length))
 
 
 # Async
-async def generate_jwt_token(user_id: uuid.UUID, expires_in: int) -> str:
+async def generate_jwt_token(user_id: uuid.UUID, expires_in: int, token_type: TokenType, claims: dict | None = None) -> str:
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(
         None,
         _generate_jwt_token_sync,
         user_id,
-        expires_in
+        expires_in,
+        token_type,
+        claims
     )
 
 
@@ -80,6 +97,16 @@ async def verify_jwt_token(token: str, private_key: str, leeway_seconds: int = 0
     )
 
 
+async def decode_jwt_token(token: str, token_type: TokenType) -> dict | None:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        _decode_jwt_token_sync,
+        token,
+        token_type
+    )
+
+
 async def generate_token(length: int = 8) -> str:
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(
@@ -89,6 +116,21 @@ async def generate_token(length: int = 8) -> str:
     )
 
 
+def build_principal_claims(user, perm_mask: int) -> dict:
+    """Claims cho chế độ STATELESS_AUTH: role, trạng thái xác thực, bitmask quyền và token version."""
+    return {
+        "rid": user.role_id,
+        "ver": user.verified,
+        "perm": perm_mask,
+        "tv": user.token_version,
+    }
+
+
+def build_verification_url(user_id: uuid.UUID, nonce: str) -> str:
+    token = security.create_link_token(EmailType.VERIFY_ACCOUNT.value, user_id, nonce, settings.VERIFY_TOKEN_EXPIRES)
+    return f"{settings.PROJECT_URL}/email/verify?token={token}"
+
+
 def get_client_meta(request: Request):
     x_forwarded_for = request.headers.get("X-Forwarded-For")
     ip = x_forwarded_for.split(",")[0].strip() if x_forwarded_for else request.client.host